@@ -52,6 +52,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # ETag on GET responses; repeated requests for unchanged data get a 304
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -91,10 +93,27 @@ DATABASES = {
         'PASSWORD': 'mypassword',# The password you set
         'HOST': 'localhost',    # Or your DB host
         'PORT': '5432',         # Default PostgreSQL port
+        # Keep connections open between API requests instead of reconnecting
+        # every time; checked before reuse so a dropped connection is replaced
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Must be shared by every API and management-command process, because the
+# invalidation versions in missions.signals are kept here (checked at
+# startup). The table is created by the missions migrations.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -177,4 +196,8 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS":
         "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 100,
-}
\ No newline at end of file
+}
+
+# Maximum rows per INSERT statement emitted by bulk_create() in the ingest
+# commands. The rows buffered per flush (--batch-size) can be much larger.
+BULK_INSERT_SQL_BATCH = 2000
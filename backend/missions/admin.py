@@ -1,16 +1,58 @@
 from django.contrib import admin
-from .models import RoverHardware, Sensor, Calibration, Mission, SensorDeployment, NavSample, LogFile
-from .models import MediaAsset, FrameIndex, ImuSample, CompassSample, PressureSample
-
-admin.site.register(RoverHardware)
-admin.site.register(Sensor)
-admin.site.register(Calibration)
-admin.site.register(Mission)
-admin.site.register(SensorDeployment)
-admin.site.register(NavSample)
-admin.site.register(LogFile)
-admin.site.register(MediaAsset)
-admin.site.register(FrameIndex)
-admin.site.register(ImuSample)
-admin.site.register(CompassSample)
-admin.site.register(PressureSample)
\ No newline at end of file
+from .models import (
+    RoverHardware, Sensor, Calibration, Mission, SensorDeployment, LogFile,
+    MediaAsset, FrameIndex, NavSample, ImuSample, CompassSample, PressureSample,
+)
+
+# Models without admin customisation
+admin.site.register([
+    RoverHardware, Sensor, Calibration, Mission, SensorDeployment, LogFile,
+    MediaAsset, FrameIndex,
+])
+
+
+#  ------------------------------------------------------------------
+#  Sample tables (millions of rows)
+#  ------------------------------------------------------------------
+
+class SampleAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for the high-volume sample tables: small pages, no
+    unfiltered COUNT(*) and the related objects used by __str__ joined in
+    the list query instead of fetched row by row.
+    """
+    list_per_page = 50
+    show_full_result_count = False
+
+
+class SensorSampleAdmin(SampleAdmin):
+    # SensorDeployment.__str__ shows the sensor and the mission (and its rover)
+    list_select_related = ("deployment__sensor", "deployment__mission__rover")
+    raw_id_fields = ("log_file", "deployment")
+    search_fields = ("log_file__bin_path",)
+
+
+@admin.register(ImuSample)
+class ImuSampleAdmin(SensorSampleAdmin):
+    list_display = (
+        "timestamp", "deployment",
+        "gx_rad_s", "gy_rad_s", "gz_rad_s", "ax_m_s2", "ay_m_s2", "az_m_s2",
+    )
+
+
+@admin.register(CompassSample)
+class CompassSampleAdmin(SensorSampleAdmin):
+    list_display = ("timestamp", "deployment", "mx_uT", "my_uT", "mz_uT")
+
+
+@admin.register(PressureSample)
+class PressureSampleAdmin(SensorSampleAdmin):
+    list_display = ("timestamp", "deployment", "pressure_pa", "temperature_C")
+
+
+@admin.register(NavSample)
+class NavSampleAdmin(SampleAdmin):
+    list_display = ("timestamp", "mission", "depth_m", "roll_deg", "pitch_deg", "yaw_deg")
+    list_select_related = ("mission__rover",)
+    raw_id_fields = ("mission",)
+
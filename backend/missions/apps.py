@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MissionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'missions'
+
+    def ready(self):
+        # Register the signal receivers and system checks
+        from missions import checks, signals  # noqa: F401
@@ -0,0 +1,47 @@
+import csv
+import io
+from django.db import connection, transaction
+
+
+def copy_rows(model_class, columns, rows, ignore_conflicts=True):
+    """
+    Load rows into the table of `model_class` with PostgreSQL COPY FROM STDIN.
+
+    `rows` is an iterable of sequences whose values follow `columns` (database
+    column names); None is written as NULL. With `ignore_conflicts` the rows are
+    copied into a temporary staging table first and moved across with
+    INSERT ... ON CONFLICT DO NOTHING, which matches
+    bulk_create(ignore_conflicts=True).
+
+    Returns the number of rows inserted.
+    """
+    quote_name = connection.ops.quote_name
+    table = quote_name(model_class._meta.db_table)
+    column_list = ", ".join(quote_name(column) for column in columns)
+
+    data = io.StringIO()
+    csv.writer(data, lineterminator="\n").writerows(rows)
+    data.seek(0)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not ignore_conflicts:
+            cursor.copy_expert(
+                f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)", data
+            )
+            return cursor.rowcount
+
+        staging = quote_name(f"_copy_{model_class._meta.db_table}")
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DROP AS "
+            f"SELECT {column_list} FROM {table} WITH NO DATA"
+        )
+        cursor.copy_expert(
+            f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv)", data
+        )
+        cursor.execute(
+            f"INSERT INTO {table} ({column_list}) "
+            f"SELECT {column_list} FROM {staging} ON CONFLICT DO NOTHING"
+        )
+        inserted = cursor.rowcount
+        cursor.execute(f"TRUNCATE {staging}")
+    return inserted
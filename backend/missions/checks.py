@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+# Backends whose entries live in one process only
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """
+    The list and sample invalidation versions (missions.signals) are bumped
+    by whichever process changes the data, e.g. a populate_frameindex run,
+    so the default cache has to be visible to all of them.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f"The default cache ({backend}) is not shared between processes.",
+            hint="Use a shared backend such as DatabaseCache, Redis or Memcached.",
+            id="missions.E001",
+        )]
+    return []
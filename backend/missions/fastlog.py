@@ -0,0 +1,197 @@
+"""
+Fast reader for ArduPilot DataFlash (.bin) logs.
+
+pymavlink's DFReader builds a DFMessage object for every record it returns.
+The ingest commands only need a few numeric fields from a handful of message
+types, so this reader memory-maps the file and decodes those fields a block
+of records at a time:
+
+* record offsets come from pymavlink's compiled indexer (dfindexer), with a
+  pure Python header walk as a fallback when the extension is not built;
+* each wanted message type gets a NumPy structured dtype describing where its
+  fields live inside a record, so a block is decoded with one gather and a
+  view instead of a struct.unpack_from call per record.
+"""
+import mmap
+import struct
+import numpy as np
+from pymavlink.DFReader import FORMAT_TO_STRUCT
+
+try:
+    from pymavlink.dfindexer import build_offsets
+except ImportError:
+    build_offsets = None
+
+HEAD1, HEAD2 = 0xA3, 0x95
+HEAD = bytes((HEAD1, HEAD2))
+FMT_TYPE = 0x80
+FMT_LENGTH = 89
+FMT_STRUCT = struct.Struct("<BB4s16s64s")
+# Positions of the Type and Length columns inside a FMT record
+FMT_TYPE_OFFSET = 3
+FMT_LENGTH_OFFSET = 4
+
+
+class UnsupportedLogError(Exception):
+    """The file cannot be decoded by FastLogReader; DFReader should be used instead."""
+
+
+class LogSchemaError(Exception):
+    """A requested message type lacks one of the requested fields."""
+
+
+class _Decoder:
+    """Decodes the requested fields of one message type from a block of records."""
+
+    def __init__(self, name, length, fmt, columns, fields):
+        self.name = name
+        missing = [field for field in fields if field not in columns]
+        if missing:
+            raise LogSchemaError(f"{name} messages lack fields: {', '.join(missing)}")
+
+        # column -> (byte position inside the record, struct code, multiplier)
+        layout = {}
+        position = 3
+        for column, char in zip(columns, fmt):
+            if char not in FORMAT_TO_STRUCT:
+                raise UnsupportedLogError(f"Unknown format character {char!r} in {name}")
+            code, mult, _ = FORMAT_TO_STRUCT[char]
+            layout[column] = (position, code, mult)
+            position += struct.calcsize(code)
+        if position > length:
+            raise UnsupportedLogError(f"{name} fields overrun its {length} byte record")
+
+        formats, positions, self.scales = [], [], []
+        for field in fields:
+            position, code, mult = layout[field]
+            if code.endswith("s"):
+                raise LogSchemaError(f"{name}.{field} is not numeric")
+            formats.append("<" + code)
+            positions.append(position)
+            self.scales.append(mult)
+        self.fields = tuple(fields)
+        self.dtype = np.dtype({
+            "names": list(fields),
+            "formats": formats,
+            "offsets": positions,
+            "itemsize": length,
+        })
+        self._span = np.arange(length)
+
+    def decode(self, data, offsets):
+        """
+        Return {field: column array} for the records starting at `offsets` in
+        `data` (the whole log as uint8). Integer fields come back as int64 and
+        everything else as float64, scaled the same way as DFMessage.
+        """
+        records = data[offsets[:, None] + self._span].view(self.dtype)[:, 0]
+        columns = {}
+        for field, mult in zip(self.fields, self.scales):
+            column = records[field]
+            if mult is None:
+                columns[field] = column.astype(np.int64 if column.dtype.kind in "iu" else np.float64)
+            elif 0.0 < mult < 1.0:
+                # Fractional multipliers are applied as a division for better
+                # floating point accuracy, as DFMessage does
+                columns[field] = column / (1 / mult)
+            else:
+                columns[field] = column * mult
+        return columns
+
+
+class FastLogReader:
+    """
+    Decode the requested fields of selected message types in a DataFlash log.
+
+    `wanted_fields` maps message type names to the field names to return.
+    Field presence is validated when the reader is opened; blocks() then
+    yields the decoded columns.
+    """
+
+    def __init__(self, path, wanted_fields):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise UnsupportedLogError(f"{path} is empty")
+
+        self._data = None
+        try:
+            if self._buf[:3] != HEAD + bytes((FMT_TYPE,)):
+                raise UnsupportedLogError(f"{path} is not a DataFlash binary log")
+            self._data = np.frombuffer(self._buf, dtype=np.uint8)
+            # message id -> record offsets, for every message id
+            self._offsets = self._index()
+            # message id -> decoder, for the wanted message types only
+            self._decoders = self._read_formats(wanted_fields)
+        except Exception:
+            self.close()
+            raise
+
+    def _index(self):
+        if build_offsets is None:
+            return self._walk_offsets()
+        return build_offsets(
+            self._data, FMT_TYPE, FMT_LENGTH, FMT_TYPE_OFFSET, FMT_LENGTH_OFFSET, HEAD1, HEAD2
+        )
+
+    def _walk_offsets(self):
+        """Pure Python equivalent of dfindexer.build_offsets()."""
+        buf = self._buf
+        size = len(buf)
+        offsets = [[] for _ in range(256)]
+        lengths = {FMT_TYPE: FMT_LENGTH}
+        offset = 0
+        while offset + 3 <= size:
+            header = buf[offset:offset + 3]
+            length = lengths.get(header[2])
+            if length is None or header[:2] != HEAD:
+                # Corrupt or unknown record: resync on the next header
+                offset = buf.find(HEAD, offset + 1)
+                if offset == -1:
+                    break
+                continue
+            if offset + length > size:
+                # Truncated final record
+                break
+            if header[2] == FMT_TYPE and offset + FMT_LENGTH_OFFSET < size:
+                lengths[buf[offset + FMT_TYPE_OFFSET]] = buf[offset + FMT_LENGTH_OFFSET]
+            offsets[header[2]].append(offset)
+            offset += length
+        return offsets
+
+    def _read_formats(self, wanted_fields):
+        decoders = {}
+        for offset in self._offsets[FMT_TYPE]:
+            msg_type, length, name, fmt, columns = FMT_STRUCT.unpack_from(self._buf, offset + 3)
+            name = name.rstrip(b"\0").decode("ascii", "replace")
+            if length < 3:
+                raise UnsupportedLogError(f"Invalid record length {length} for {name}")
+            if name in wanted_fields:
+                decoders[msg_type] = _Decoder(
+                    name,
+                    length,
+                    fmt.rstrip(b"\0").decode("ascii", "replace"),
+                    columns.rstrip(b"\0").decode("ascii", "replace").split(","),
+                    wanted_fields[name],
+                )
+        return decoders
+
+    def blocks(self, block_size):
+        """
+        Yield (message type, {field: column array}) for every wanted message
+        type in blocks of at most `block_size` records. Records of one type
+        come out in log order; the types themselves are not interleaved.
+        """
+        for msg_type, decoder in self._decoders.items():
+            offsets = np.asarray(self._offsets[msg_type], dtype=np.intp)
+            for start in range(0, len(offsets), block_size):
+                yield decoder.name, decoder.decode(self._data, offsets[start:start + block_size])
+
+    def close(self):
+        # The NumPy view has to go before the mapping can be closed
+        self._data = None
+        self._buf.close()
+        self._file.close()
@@ -1,6 +1,14 @@
 import django_filters as filters
+from django import forms
 from missions.models import Mission
 from missions.models import MediaAsset
+from missions.models import RoverHardware, Calibration
+
+
+class JSONFilter(filters.Filter):
+    """Takes a JSON document as its value; invalid JSON is a 400."""
+    field_class = forms.JSONField
+
 
 class MissionFilter(filters.FilterSet):
     start_after = filters.DateTimeFilter(field_name="start_time", lookup_expr="gte")
@@ -18,20 +26,23 @@ class MediaAssetFilter(filters.FilterSet):
         field_name='deployment__mission__location', 
         lookup_expr='iexact'
     )
+    # Depth/yaw filters match assets with at least one frame in range, using
+    # the ranges denormalised onto MediaAsset: "some frame >= x" is
+    # "max >= x" and "some frame <= x" is "min <= x"
     depth_min = filters.NumberFilter(
-        field_name='frames__closest_nav_sample__depth_m',
+        field_name='depth_max_m',
         lookup_expr='gte'
     )
     depth_max = filters.NumberFilter(
-        field_name='frames__closest_nav_sample__depth_m',
+        field_name='depth_min_m',
         lookup_expr='lte'
     )
     yaw_min = filters.NumberFilter(
-        field_name='frames__closest_nav_sample__yaw_deg',
+        field_name='yaw_max_deg',
         lookup_expr='gte'
     )
     yaw_max = filters.NumberFilter(
-        field_name='frames__closest_nav_sample__yaw_deg',
+        field_name='yaw_min_deg',
         lookup_expr='lte'
     )
     
@@ -43,4 +54,22 @@ class MediaAssetFilter(filters.FilterSet):
             'deployment__mission': ['exact'],
             'deployment__sensor': ['exact'],
             'deployment__sensor__sensor_type': ['exact'],
-        }
\ No newline at end of file
+        }
+
+
+# ?hardware_config={"camera": "rpi"} matches configs containing that JSON,
+# served by the GIN index on the column
+class RoverHardwareFilter(filters.FilterSet):
+    hardware_config = JSONFilter(lookup_expr='contains')
+
+    class Meta:
+        model = RoverHardware
+        fields = ['hardware_config']
+
+
+class CalibrationFilter(filters.FilterSet):
+    coefficients = JSONFilter(lookup_expr='contains')
+
+    class Meta:
+        model = Calibration
+        fields = ['sensor', 'active', 'coefficients']
@@ -1,35 +1,67 @@
+import copy
+import math
 import os
+import queue
+import threading
+import time
+from collections import Counter
+import django
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
 from django.conf import settings
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone as django_timezone
-from django.db import transaction
+from django.db import connections, transaction
+from itertools import repeat
+from missions.bulk import copy_rows
+from missions.fastlog import FastLogReader, LogSchemaError, UnsupportedLogError
 from missions.models import (
     Mission, LogFile, SensorDeployment, 
     NavSample, ImuSample, CompassSample, PressureSample
 )
 from pymavlink import mavutil
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = "Parse a log file by LogFile ID, unless already parsed (simplified version)."
+    help = "Parse log files by LogFile ID, unless already parsed (simplified version)."
 
     def add_arguments(self, parser):
         parser.add_argument(
             "--logfile-id", 
             type=int, 
+            nargs="+",
             required=True, 
-            help="ID of the LogFile to parse."
+            help="ID(s) of the LogFile(s) to parse; several files are parsed in parallel."
+        )
+        parser.add_argument(
+            "--workers", 
+            type=int, 
+            default=None, 
+            help="Worker processes used for several log files (default: one per CPU core)."
         )
         parser.add_argument(
             "--batch-size", 
             type=int, 
-            default=1000, 
-            help="Batch size for bulk insert operations."
+            default=10000, 
+            help="Number of samples buffered per table before they are written."
+        )
+        parser.add_argument(
+            "--sql-batch-size", 
+            type=int, 
+            default=settings.BULK_INSERT_SQL_BATCH, 
+            help="Maximum rows per INSERT statement for bulk_create writes."
+        )
+        parser.add_argument(
+            "--commit-every", 
+            type=int, 
+            default=None, 
+            help="Commit after roughly this many saved samples (default: one transaction for the whole file)."
         )
         parser.add_argument(
             "--force", 
@@ -56,8 +88,40 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        logfile_id = options["logfile_id"]
+        logfile_ids = options["logfile_id"]
+        if len(logfile_ids) == 1:
+            self.parse_logfile(logfile_ids[0], options)
+            return
+        
+        # Parsing is CPU bound, so separate log files go to separate processes.
+        # Every file writes its own rows, so the workers do not contend for locks.
+        workers = min(options["workers"] or os.cpu_count(), len(logfile_ids))
+        worker_options = {name: options[name] for name in WORKER_OPTIONS}
+        # Worker processes have to open their own database connections
+        connections.close_all()
+        failed = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            futures = {
+                executor.submit(_parse_logfile, logfile_id, worker_options): logfile_id
+                for logfile_id in logfile_ids
+            }
+            for future in as_completed(futures):
+                logfile_id = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    failed.append(logfile_id)
+                    self.stdout.write(self.style.ERROR(f"LogFile {logfile_id} failed: {str(e)}"))
+        
+        if failed:
+            raise CommandError(f"Failed to parse LogFiles: {', '.join(map(str, sorted(failed)))}")
+        self.stdout.write(self.style.SUCCESS(f"Parsed {len(logfile_ids)} log files."))
+
+    def parse_logfile(self, logfile_id, options):
+        """Parse one LogFile; `options` are the command's parsed options."""
         batch_size = options["batch_size"]
+        sql_batch_size = options["sql_batch_size"]
+        commit_every = options["commit_every"]
         force = options["force"]
         
         # Parse instance arguments
@@ -66,7 +130,8 @@ class Command(BaseCommand):
         baro_instances = [int(x.strip()) for x in options["baro_instances"].split(",")]
         
         try:
-            logfile = LogFile.objects.get(pk=logfile_id)
+            # The mission (and its rover, used by Mission.__str__) comes in the same query
+            logfile = LogFile.objects.select_related("mission__rover").get(pk=logfile_id)
         except LogFile.DoesNotExist:
             raise CommandError(f"LogFile with id={logfile_id} does not exist.")
 
@@ -83,24 +148,28 @@ class Command(BaseCommand):
         self.stdout.write(f"MAG instances: {mag_instances}")
         self.stdout.write(f"BARO instances: {baro_instances}")
         
-        # Get deployments for linking samples
-        deployments = SensorDeployment.objects.filter(mission=mission)
-        deployments_by_sensor_type = {}
-        for deployment in deployments:
-            sensor_type = deployment.sensor.sensor_type
-            instance = getattr(deployment, "instance", None)  # assumes deployment.instance exists
-            if instance is not None:
-                deployments_by_sensor_type.setdefault(sensor_type, {})[instance] = deployment
+        # Get deployment ids for linking samples; the loader only ever needs
+        # the primary keys, so no model instances are built here
+        deployments = (
+            SensorDeployment.objects
+            .filter(mission=mission)
+            .values_list("sensor__sensor_type", "instance", "pk")
+        )
+        deployment_ids = {}
+        for sensor_type, instance, deployment_id in deployments:
+            deployment_ids.setdefault(sensor_type, {})[instance] = deployment_id
         
         # Initialize the simplified loader
         loader = SimplifiedBinLoader(
             logfile=logfile,
             mission=mission,
-            deployments_by_sensor_type=deployments_by_sensor_type,
+            deployment_ids=deployment_ids,
             imu_instances=imu_instances,
             mag_instances=mag_instances,
             baro_instances=baro_instances,
             batch_size=batch_size,
+            sql_batch_size=sql_batch_size,
+            commit_every=commit_every,
             stdout=self.stdout
         )
         
@@ -116,6 +185,139 @@ class Command(BaseCommand):
             raise
 
 
+# Options a worker process needs to parse one log file
+WORKER_OPTIONS = (
+    "batch_size", "sql_batch_size", "commit_every", "force",
+    "imu_instances", "mag_instances", "baro_instances",
+)
+
+
+def _parse_logfile(logfile_id, options):
+    """Process pool entry point: parse one log file with a fresh Command."""
+    Command().parse_logfile(logfile_id, options)
+
+
+class SampleBuffer:
+    """
+    Column-oriented (SoA) staging buffer for one sample model.
+
+    Every column is a preallocated NumPy array filled a slice at a time from
+    the decoded log blocks; model instances are built once per batch, when the
+    buffer is flushed. NaN marks a missing value. Timestamps are kept as the raw log
+    TimeUS (int64 microseconds) and converted to datetimes in one vectorised
+    step against `time_base` when the buffer is read.
+    """
+
+    # Model field type -> NumPy dtype used for its column
+    DTYPES = {
+        "ForeignKey": np.int64,
+        "FloatField": np.float64,
+    }
+
+    def __init__(self, model_class, field_names, capacity, time_base):
+        self.model_class = model_class
+        self.capacity = capacity
+        self.size = 0
+        self.time_base = np.datetime64(
+            django_timezone.make_naive(time_base, timezone.utc), "us"
+        )
+
+        fields = [model_class._meta.get_field(name) for name in field_names]
+        # ForeignKeys are stored by id, under their attname (e.g. `deployment_id`)
+        self.columns = tuple(field.attname for field in fields)
+        self.nullable = frozenset(field.attname for field in fields if field.null)
+        self.arrays = tuple(
+            np.empty(capacity, dtype=self.DTYPES[field.get_internal_type()])
+            for field in fields
+        )
+        self.time_us = np.empty(capacity, dtype=np.int64)
+
+    def __len__(self):
+        return self.size
+
+    def is_full(self):
+        return self.size >= self.capacity
+
+    def extend(self, time_us, *columns):
+        """
+        Copy rows from column arrays (in `field_names` order) into the free
+        space of the buffer. Returns how many rows were taken; the caller
+        flushes and passes the rest again when the buffer fills up.
+        """
+        start = self.size
+        count = min(len(time_us), self.capacity - start)
+        end = start + count
+        self.time_us[start:end] = time_us[:count]
+        for array, column in zip(self.arrays, columns):
+            array[start:end] = column[:count]
+        self.size = end
+        return count
+
+    def clear(self):
+        self.size = 0
+
+    def detach(self):
+        """
+        Hand the buffered rows over to a new buffer object and continue with
+        freshly allocated arrays, so the rows can be written elsewhere while
+        this buffer keeps filling.
+        """
+        filled = copy.copy(self)
+        self.time_us = np.empty_like(self.time_us)
+        self.arrays = tuple(np.empty_like(array) for array in self.arrays)
+        self.size = 0
+        return filled
+
+    def to_instances(self, epoch_field=None, **extra):
+        """
+        Materialise the buffered rows as unsaved model instances. If given,
+        `epoch_field` is set to the timestamp in integer microseconds since
+        the Unix epoch.
+        """
+        stamps = self._timestamps()
+        timestamps = [
+            value.replace(tzinfo=timezone.utc)
+            for value in stamps.tolist()
+        ]
+        columns = [
+            self._column_values(name, array[:self.size])
+            for name, array in zip(self.columns, self.arrays)
+        ]
+        names = self.columns
+        if epoch_field:
+            names = (*names, epoch_field)
+            columns.append(stamps.astype(np.int64).tolist())
+        return [
+            self.model_class(timestamp=timestamp, **extra, **dict(zip(names, row)))
+            for timestamp, *row in zip(timestamps, *columns)
+        ]
+
+    def to_rows(self, **extra):
+        """
+        Return (column names, rows) for COPY; `extra` adds constant columns.
+        Timestamps are rendered as ISO-8601 UTC strings.
+        """
+        timestamps = np.datetime_as_string(
+            self._timestamps(), unit="us", timezone="UTC"
+        )
+        columns = [
+            self._column_values(name, array[:self.size])
+            for name, array in zip(self.columns, self.arrays)
+        ]
+        names = (*extra, "timestamp", *self.columns)
+        rows = zip(*map(repeat, extra.values()), timestamps.tolist(), *columns)
+        return names, rows
+
+    def _timestamps(self):
+        """Buffered TimeUS values as UTC datetime64[us]."""
+        return self.time_base + self.time_us[:self.size].astype("timedelta64[us]")
+
+    def _column_values(self, name, array):
+        if name in self.nullable:
+            return [None if math.isnan(value) else value for value in array.tolist()]
+        return array.tolist()
+
+
 class SimplifiedBinLoader:
     """
     Simplified loader class for parsing ArduPilot .bin log files.
@@ -124,15 +326,33 @@ class SimplifiedBinLoader:
     deployment-based lookup system.
     """
     
-    def __init__(self, logfile, mission, deployments_by_sensor_type, 
-                 imu_instances, mag_instances, baro_instances, batch_size=1000, stdout=None):
+    # How many full buffers may wait for the writer thread before parsing blocks
+    WRITE_QUEUE_SIZE = 8
+    # Seconds between "Saved ..." progress lines
+    PROGRESS_INTERVAL = 10
+    
+    def __init__(self, logfile, mission, deployment_ids, 
+                 imu_instances, mag_instances, baro_instances, batch_size=10000,
+                 sql_batch_size=None, commit_every=None, stdout=None):
         self.logfile = logfile
         self.mission = mission
-        self.deployments_by_sensor_type = deployments_by_sensor_type
-        self.imu_instances = imu_instances
-        self.mag_instances = mag_instances
-        self.baro_instances = baro_instances
+        # {sensor type: {instance: SensorDeployment id}}
+        self.deployment_ids = deployment_ids
+        self.imu_instances = frozenset(imu_instances)
+        self.mag_instances = frozenset(mag_instances)
+        self.baro_instances = frozenset(baro_instances)
         self.batch_size = batch_size
+        self.sql_batch_size = sql_batch_size or settings.BULK_INSERT_SQL_BATCH
+        self.commit_every = commit_every
+        # Writer thread state: rows written since the last commit, rows that
+        # failed to save, and the error that stopped the thread (if any)
+        self._uncommitted = 0
+        self._failed_rows = 0
+        self._writer_error = None
+        self._aborted = False
+        # Rows saved per model since the last progress line
+        self._saved_since_progress = Counter()
+        self._last_progress = time.monotonic()
         self.stdout = stdout
         
         self.stats = {
@@ -151,14 +371,78 @@ class SimplifiedBinLoader:
         if not bin_path.exists():
             raise CommandError(f"Binary log file not found: {bin_path}")
         
-        # Initialize pymavlink connection
+        # Message type -> handler. Only these types are decoded from the log,
+        # every other record is skipped.
+        self._dispatch = {
+            "IMU": self._process_imu_message,
+            "MAG": self._process_mag_message,
+            "BARO": self._process_baro_message,
+            "AHR2": self._process_ahr2_message,
+        }
+
+        # Fields each handler reads, in the order they are returned. TimeUS
+        # always comes first so the parsing loop can read it by position.
+        self._wanted_fields = {
+            "IMU": ("TimeUS", "I", "GyrX", "GyrY", "GyrZ", "AccX", "AccY", "AccZ"),
+            "MAG": ("TimeUS", "I", "MagX", "MagY", "MagZ"),
+            "BARO": ("TimeUS", "I", "Press", "Temp"),
+            "AHR2": ("TimeUS", "Roll", "Pitch", "Yaw", "Alt"),
+        }
+        
+        # Drop requested instances that have no deployment on this mission, and
+        # sensor message types left without any, so they are never decoded
+        sensors = {
+            "IMU": ("imu", "imu_instances"),
+            "MAG": ("compass", "mag_instances"),
+            "BARO": ("pressure", "baro_instances"),
+        }
+        # Message type -> {instance: deployment id} for the instances kept
+        self._instance_deployments = {}
+        for msg_type, (sensor_type, attr) in sensors.items():
+            deployed = self.deployment_ids.get(sensor_type, {})
+            for instance in getattr(self, attr):
+                if instance not in deployed:
+                    logger.warning(f"No deployment found for sensor type '{sensor_type}' instance {instance}")
+            instances = getattr(self, attr).intersection(deployed)
+            setattr(self, attr, instances)
+            self._instance_deployments[msg_type] = {
+                instance: deployed[instance] for instance in instances
+            }
+            if not instances:
+                del self._dispatch[msg_type]
+                del self._wanted_fields[msg_type]
+        
+        # Prefer the mmap/struct reader; pymavlink's DFReader is only used for
+        # logs it cannot decode. Either way the FMT records are checked once
+        # here and the hot path reads fields without any presence checks.
+        self.log_connection = None
         try:
-            self.log_connection = mavutil.mavlink_connection(
-                str(bin_path), 
-                dialect="ardupilotmega"
-            )
+            self.fast_reader = FastLogReader(bin_path, self._wanted_fields)
+        except LogSchemaError as e:
+            raise CommandError(f"{bin_path}: {e}")
+        except UnsupportedLogError as e:
+            logger.info(f"Falling back to DFReader for {bin_path}: {e}")
+            self.fast_reader = None
         except Exception as e:
             raise CommandError(f"Failed to open log file: {str(e)}")
+        
+        if self.fast_reader is None:
+            # Initialize pymavlink connection
+            try:
+                self.log_connection = mavutil.mavlink_connection(
+                    str(bin_path), 
+                    dialect="ardupilotmega"
+                )
+            except Exception as e:
+                raise CommandError(f"Failed to open log file: {str(e)}")
+            self._field_idx = self._compile_field_slots(bin_path)
+
+        # Mission window in TimeUS (microseconds since boot, relative to the log
+        # file creation time) so messages are range-checked with an integer
+        # compare before any datetime work
+        one_us = timedelta(microseconds=1)
+        self._tus_lo = (self.mission.start_time - self.logfile.created_at) // one_us
+        self._tus_hi = (self.mission.end_time - self.logfile.created_at) // one_us
     
     def log_message(self, message):
         """Helper to log messages to stdout if available."""
@@ -169,201 +453,308 @@ class SimplifiedBinLoader:
         """Main parsing loop with simplified logic."""
         self.log_message("Starting simplified log file parsing...")
         
-        # Initialize batch containers
+        # Get the log file creation time as baseline for timestamp conversion
+        log_file_created = self.logfile.created_at
+        
+        # Initialize column buffers, one per sample model
         batches = {
-            ImuSample: [],
-            CompassSample: [],
-            PressureSample: [],
-            NavSample: [],
+            ImuSample: SampleBuffer(ImuSample, (
+                "deployment",
+                "gx_rad_s", "gy_rad_s", "gz_rad_s", "ax_m_s2", "ay_m_s2", "az_m_s2",
+            ), self.batch_size, log_file_created),
+            CompassSample: SampleBuffer(CompassSample, (
+                "deployment", "mx_uT", "my_uT", "mz_uT",
+            ), self.batch_size, log_file_created),
+            PressureSample: SampleBuffer(PressureSample, (
+                "deployment", "pressure_pa", "temperature_C",
+            ), self.batch_size, log_file_created),
+            NavSample: SampleBuffer(NavSample, (
+                "roll_deg", "pitch_deg", "yaw_deg", "depth_m",
+            ), self.batch_size, log_file_created),
         }
         
-        # Get the log file creation time as baseline for timestamp conversion
-        log_file_created = self.logfile.created_at
+        # Full buffers are handed to a writer thread through a bounded queue,
+        # so decoding carries on while a batch is being written
+        self._write_queue = queue.Queue(maxsize=self.WRITE_QUEUE_SIZE)
+        writer = threading.Thread(
+            target=self._writer, args=(self._write_queue,), name="parse_bin_log-writer"
+        )
+        writer.start()
+        try:
+            self._process_blocks(self._iter_blocks(), batches)
+            
+            # Flush any remaining batches
+            for model_class, batch in batches.items():
+                if batch:
+                    self._write_queue.put((model_class, batch.detach()))
+        except BaseException:
+            # Roll back whatever the writer has not committed yet
+            self._aborted = True
+            raise
+        finally:
+            self._write_queue.put(None)
+            writer.join()
+            # Release the mapping and file handle on failure too; a worker
+            # process parses several logs
+            if self.fast_reader is not None:
+                self.fast_reader.close()
         
-        # Process messages
-        for msg in iter(self.log_connection.recv_match, None):
-            if msg is None:
-                break
-                
-            self.stats["total_messages"] += 1
+        self.stats["errors"] += self._failed_rows
+        if self._writer_error is not None:
+            raise CommandError(f"Writing samples failed: {self._writer_error}")
+        
+        # Print statistics
+        self._print_statistics()
+    
+    def _process_blocks(self, blocks, batches):
+        """Buffer every block from `blocks`, queueing buffers as they fill up."""
+        dispatch = self._dispatch
+        tus_lo, tus_hi = self._tus_lo, self._tus_hi
+        
+        # Process messages a block of records at a time
+        for msg_type, columns in blocks:
+            count = len(columns["TimeUS"])
+            self.stats["total_messages"] += count
             
             try:
-                # Convert timestamp to timezone-aware datetime
-                timestamp = self._resolve_timestamp(msg, log_file_created)
-                
-                # Check if timestamp is within mission bounds
-                if not (self.mission.start_time <= timestamp <= self.mission.end_time):
+                # Keep only records whose TimeUS is within mission bounds
+                time_us = columns["TimeUS"]
+                in_window = (time_us >= tus_lo) & (time_us <= tus_hi)
+                if not in_window.all():
+                    columns = {name: column[in_window] for name, column in columns.items()}
+                count = len(columns["TimeUS"])
+                if not count:
                     continue
                 
-                self.stats["filtered_messages"] += 1
-                
-                # Process message based on type
-                msg_type = msg.get_type()
-                
-                if msg_type == "IMU":
-                    self._process_imu_message(msg, timestamp, batches)
-                elif msg_type == "MAG":
-                    self._process_mag_message(msg, timestamp, batches)
-                elif msg_type == "BARO":
-                    self._process_baro_message(msg, timestamp, batches)
-                elif msg_type == "AHR2":
-                    self._process_ahr2_message(msg, timestamp, batches)
+                self.stats["filtered_messages"] += count
                 
-                # Check if we need to flush batches
-                for model_class, batch in batches.items():
-                    if len(batch) >= self.batch_size:
-                        self._flush_batch(model_class, batch)
-                        batches[model_class] = []
+                # Process block based on message type
+                handler = dispatch.get(msg_type)
+                if handler:
+                    handler(columns, batches)
                             
             except Exception as e:
-                self.stats["errors"] += 1
-                logger.error(f"Error processing message {msg.get_type()}: {str(e)}")
+                self.stats["errors"] += count
+                logger.error(f"Error processing {msg_type} block: {str(e)}")
                 continue
-        
-        # Flush any remaining batches
-        for model_class, batch in batches.items():
-            if batch:
-                self._flush_batch(model_class, batch)
-        
-        # Print statistics
-        self._print_statistics()
     
-    def _process_imu_message(self, msg, timestamp, batches):
-        """Process IMU messages for specified instances."""
-        if not hasattr(msg, 'I'):
-            return
-        
-        instance = msg.I
-        if instance not in self.imu_instances:
+    def _iter_blocks(self):
+        """
+        Yield (message type, {field: column array}) blocks of at most
+        `batch_size` records from whichever reader opened the log.
+        """
+        if self.fast_reader is not None:
+            yield from self.fast_reader.blocks(self.batch_size)
             return
         
-        # Get appropriate deployment
-        deployment = self._get_deployment_for_sensor_type('imu', instance)
-        if not deployment:
-            return
-        
-        # Create IMU sample
-        sample = ImuSample(
-            log_file=self.logfile,
-            deployment=deployment,
-            timestamp=timestamp,
-            gx_rad_s=getattr(msg, 'GyrX', 0.0),
-            gy_rad_s=getattr(msg, 'GyrY', 0.0),
-            gz_rad_s=getattr(msg, 'GyrZ', 0.0),
-            ax_m_s2=getattr(msg, 'AccX', 0.0),
-            ay_m_s2=getattr(msg, 'AccY', 0.0),
-            az_m_s2=getattr(msg, 'AccZ', 0.0),
+        recv_match = partial(
+            self.log_connection.recv_match, type=set(self._dispatch), blocking=False
         )
-        
-        batches[ImuSample].append(sample)
-        self.stats["saved_samples"] += 1
-        self.stats["by_type"]["IMU"] = self.stats["by_type"].get("IMU", 0) + 1
+        pending = {msg_type: [] for msg_type in self._wanted_fields}
+        for msg in iter(recv_match, None):
+            msg_type = msg.get_type()
+            rows = pending[msg_type]
+            rows.append(self._read_fields(msg))
+            if len(rows) >= self.batch_size:
+                yield msg_type, self._rows_to_columns(msg_type, rows)
+                rows.clear()
+        for msg_type, rows in pending.items():
+            if rows:
+                yield msg_type, self._rows_to_columns(msg_type, rows)
     
-    def _process_mag_message(self, msg, timestamp, batches):
+    def _rows_to_columns(self, msg_type, rows):
+        return {
+            name: np.asarray(column)
+            for name, column in zip(self._wanted_fields[msg_type], zip(*rows))
+        }
+    
+    def _read_fields(self, msg):
+        """
+        Return the wanted fields of `msg`, read straight from its element list.
+
+        DFMessage attribute access looks every field up by name and converts it
+        on each call; the element index and multiplier of each wanted field are
+        resolved once per message type instead.
+        """
+        elements = msg._elements
+        return [
+            elements[index] / divisor if divisor
+            else elements[index] * multiplier if multiplier
+            else elements[index]
+            for index, divisor, multiplier in self._field_idx[msg.fmt.name]
+        ]
+    
+    def _compile_field_slots(self, bin_path):
+        """
+        Validate the log's FMT records against the wanted fields and build
+        (index, divisor, multiplier) slots for every consumed message type.
+        """
+        field_idx = {}
+        for fmt in self.log_connection.formats.values():
+            wanted = self._wanted_fields.get(fmt.name)
+            if wanted is None:
+                continue
+            missing = [name for name in wanted if name not in fmt.colhash]
+            if missing:
+                raise CommandError(
+                    f"{fmt.name} messages in {bin_path} lack fields: {', '.join(missing)}"
+                )
+            slots = []
+            for name in wanted:
+                index = fmt.colhash[name]
+                mult = fmt.msg_mults[index]
+                # Same arithmetic as DFMessage: fractional multipliers are applied
+                # as a division for better floating point accuracy
+                if mult is not None and 0.0 < mult < 1.0:
+                    slots.append((index, 1 / mult, None))
+                else:
+                    slots.append((index, None, mult))
+            field_idx[fmt.name] = tuple(slots)
+        return field_idx
+    
+    def _process_imu_message(self, columns, batches):
+        """Process IMU messages for specified instances."""
+        self._buffer_sensor_samples(
+            "IMU", columns, batches[ImuSample],
+            ("GyrX", "GyrY", "GyrZ", "AccX", "AccY", "AccZ"),
+        )
+    
+    def _process_mag_message(self, columns, batches):
         """Process MAG messages for specified instances."""
-        if not hasattr(msg, 'I'):
-            return
-        
-        instance = msg.I
-        if instance not in self.mag_instances:
-            return
-        
-        # Get appropriate deployment
-        deployment = self._get_deployment_for_sensor_type('compass', instance)
-        if not deployment:
-            return
-        
-        # Create compass sample
-        sample = CompassSample(
-            log_file=self.logfile,
-            deployment=deployment,
-            timestamp=timestamp,
-            mx_uT=getattr(msg, 'MagX', 0.0),
-            my_uT=getattr(msg, 'MagY', 0.0),
-            mz_uT=getattr(msg, 'MagZ', 0.0),
+        self._buffer_sensor_samples(
+            "MAG", columns, batches[CompassSample],
+            ("MagX", "MagY", "MagZ"),
         )
-        
-        batches[CompassSample].append(sample)
-        self.stats["saved_samples"] += 1
-        self.stats["by_type"]["MAG"] = self.stats["by_type"].get("MAG", 0) + 1
     
-    def _process_baro_message(self, msg, timestamp, batches):
+    def _process_baro_message(self, columns, batches):
         """Process BARO messages for specified instances."""
-        if not hasattr(msg, 'I'):
-            return
-        
-        instance = msg.I
-        if instance not in self.baro_instances:
-            return
-        
-        # Get appropriate deployment
-        deployment = self._get_deployment_for_sensor_type('pressure', instance)
-        if not deployment:
-            return
-        
-        # Create pressure sample
-        sample = PressureSample(
-            log_file=self.logfile,
-            deployment=deployment,
-            timestamp=timestamp,
-            pressure_pa=getattr(msg, 'Press', 0.0),
-            temperature_C=getattr(msg, 'Temp', None),
+        self._buffer_sensor_samples(
+            "BARO", columns, batches[PressureSample],
+            ("Press", "Temp"),
         )
-        
-        batches[PressureSample].append(sample)
-        self.stats["saved_samples"] += 1
-        self.stats["by_type"]["BARO"] = self.stats["by_type"].get("BARO", 0) + 1
     
-    def _process_ahr2_message(self, msg, timestamp, batches):
+    def _process_ahr2_message(self, columns, batches):
         """Process AHR2 messages for navigation altitude data."""
-        # Create navigation sample with altitude data
-        alt = getattr(msg, 'Alt', None)
-        # depth is negative of altitude
-        depth_m = -alt if alt is not None else None
-        sample = NavSample(
-            mission=self.mission,
-            timestamp=timestamp,
-            roll_deg=getattr(msg, 'Roll', None),
-            pitch_deg=getattr(msg, 'Pitch', None),
-            yaw_deg=getattr(msg, 'Yaw', None),
-            depth_m=depth_m,  # Depth in meters
+        # Buffer navigation samples; depth is negative of altitude
+        self._buffer_rows(
+            NavSample,
+            batches[NavSample],
+            columns["TimeUS"],
+            columns["Roll"],
+            columns["Pitch"],
+            columns["Yaw"],
+            -columns["Alt"],
         )
-        
-        batches[NavSample].append(sample)
-        self.stats["saved_samples"] += 1
-        self.stats["by_type"]["AHR2"] = self.stats["by_type"].get("AHR2", 0) + 1
+        count = len(columns["TimeUS"])
+        self.stats["saved_samples"] += count
+        self.stats["by_type"]["AHR2"] = self.stats["by_type"].get("AHR2", 0) + count
     
-    def _get_deployment_for_sensor_type(self, sensor_type, instance):
-        """Get deployment for a specific sensor type and instance."""
-        instances = self.deployments_by_sensor_type.get(sensor_type, {})
-        deployment = instances.get(instance)
-        if deployment:
-            return deployment
-        logger.warning(f"No deployment found for sensor type '{sensor_type}' instance {instance}")
-        return None
+    def _buffer_sensor_samples(self, msg_type, columns, batch, value_fields):
+        """Buffer the rows of a sensor message block, split by the instance column."""
+        instance_ids = columns["I"]
+        deployments = self._instance_deployments[msg_type]
+        for instance in np.unique(instance_ids).tolist():
+            # Only instances requested and deployed on this mission are kept
+            deployment_id = deployments.get(instance)
+            if deployment_id is None:
+                continue
+            
+            selected = instance_ids == instance
+            count = int(np.count_nonzero(selected))
+            self._buffer_rows(
+                batch.model_class,
+                batch,
+                columns["TimeUS"][selected],
+                np.full(count, deployment_id),
+                *(columns[field][selected] for field in value_fields),
+            )
+            self.stats["saved_samples"] += count
+            self.stats["by_type"][msg_type] = self.stats["by_type"].get(msg_type, 0) + count
     
-    def _resolve_timestamp(self, msg, log_file_created):
-        """Convert message timestamp to timezone-aware datetime."""
-        if hasattr(msg, 'TimeUS') and msg.TimeUS:
-            # TimeUS is microseconds since boot
-            time_offset_seconds = msg.TimeUS / 1_000_000
-            return log_file_created + django_timezone.timedelta(seconds=time_offset_seconds)
-        
-        # Last resort: use log file creation time
-        return log_file_created
+    def _buffer_rows(self, model_class, batch, time_us, *columns):
+        """Copy column arrays into `batch`, flushing it every time it fills up."""
+        while len(time_us):
+            taken = batch.extend(time_us, *columns)
+            if batch.is_full():
+                self._write_queue.put((model_class, batch.detach()))
+            time_us = time_us[taken:]
+            columns = [column[taken:] for column in columns]
+    
+    def _writer(self, write_queue):
+        """
+        Writer thread: flush queued buffers until the None sentinel arrives.
+
+        Samples are written in one transaction per log file (or per
+        --commit-every rows), so the commit cost is paid once rather than once
+        per batch. The thread uses its own database connection.
+        """
+        try:
+            finished = False
+            while not finished:
+                with transaction.atomic():
+                    while True:
+                        item = write_queue.get()
+                        if item is None:
+                            finished = True
+                            if self._aborted:
+                                transaction.set_rollback(True)
+                            break
+                        self._flush_batch(*item)
+                        if self.commit_every and self._uncommitted >= self.commit_every:
+                            break
+                self._uncommitted = 0
+            self._log_progress()
+        except Exception as e:
+            logger.error(f"Sample writer failed: {str(e)}")
+            self._writer_error = e
+            # Keep draining so the parsing thread never blocks on a full queue
+            while write_queue.get() is not None:
+                pass
+        finally:
+            connections.close_all()
     
     def _flush_batch(self, model_class, batch):
-        """Flush a batch of samples to the database."""
-        if not batch:
+        """
+        Flush a buffer of samples to the database and reset it.
+
+        The high-volume sensor tables are loaded with COPY; NavSample rows are
+        few enough that bulk_create is kept for them. Rows that are already
+        stored are skipped through the tables' unique constraints, so
+        re-parsing a log with --force does not duplicate samples.
+        """
+        count = len(batch)
+        if not count:
             return
         
         try:
-            with transaction.atomic():
-                model_class.objects.bulk_create(batch, ignore_conflicts=True)
-            self.log_message(f"Saved {len(batch)} {model_class.__name__} samples")
+            if model_class is NavSample:
+                samples = batch.to_instances(epoch_field="ts_us", mission_id=self.mission.pk)
+                with transaction.atomic():
+                    model_class.objects.bulk_create(
+                        samples, batch_size=self.sql_batch_size, ignore_conflicts=True
+                    )
+            else:
+                columns, rows = batch.to_rows(log_file_id=self.logfile.pk)
+                copy_rows(model_class, columns, rows)
+            self._uncommitted += count
+            self._saved_since_progress[model_class.__name__] += count
+            if time.monotonic() - self._last_progress >= self.PROGRESS_INTERVAL:
+                self._log_progress()
         except Exception as e:
             logger.error(f"Error saving batch of {model_class.__name__}: {str(e)}")
-            self.stats["errors"] += len(batch)
+            self._failed_rows += count
+        finally:
+            batch.clear()
+    
+    def _log_progress(self):
+        """Report the rows saved since the last report, one line for all models."""
+        if self._saved_since_progress:
+            saved = ", ".join(
+                f"{count} {name}" for name, count in self._saved_since_progress.items()
+            )
+            self.log_message(f"Saved {saved} samples")
+            self._saved_since_progress.clear()
+        self._last_progress = time.monotonic()
     
     def _print_statistics(self):
         """Print parsing statistics."""
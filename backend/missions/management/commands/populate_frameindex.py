@@ -1,47 +1,223 @@
 import os
+import django
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from django.conf import settings
 from datetime import datetime, timezone, timedelta
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone as django_timezone
-from django.db import transaction
+from django.db import connection, connections
+from django.db.models import Count, Max, Sum
+from itertools import repeat
+from missions.bulk import copy_rows
 from missions.models import MediaAsset, FrameIndex, NavSample
-from bisect import bisect_left
+from array import array
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_US = timedelta(microseconds=1)
+
+# Smallest load (in frames) that --rebuild-indexes drops the indexes for
+REBUILD_INDEXES_MIN_FRAMES = 1_000_000
+
+
+def to_us(value):
+    """Aware datetime -> integer microseconds since the Unix epoch."""
+    return (value - EPOCH) // ONE_US
+
 
 class Command(BaseCommand):
-    help = "Populate FrameIndex for a video MediaAsset by calculating frame timestamps and linking closest NavSample."
+    help = "Populate FrameIndex for video MediaAssets by calculating frame timestamps and linking closest NavSample."
 
     def add_arguments(self, parser):
         parser.add_argument(
             "--mediaasset-id", 
             type=int, 
+            nargs="+",
             required=True, 
-            help="ID of the MediaAsset to process."
+            help="ID(s) of the MediaAsset(s) to process; several assets are processed in parallel."
+        )
+        parser.add_argument(
+            "--workers", 
+            type=int, 
+            default=None, 
+            help="Worker processes used for several assets (default: one per CPU core)."
         )
         parser.add_argument(
             "--batch-size", 
             type=int, 
-            default=1000, 
-            help="Batch size for bulk insert operations."
+            default=5000, 
+            help="Frame index rows written per COPY batch."
         )
         parser.add_argument(
             "--force", 
             action="store_true", 
             help="Force re-processing even if FrameIndex records already exist."
         )
+        parser.add_argument(
+            "--max-nav-gap-ms", 
+            type=int, 
+            default=None, 
+            help="Leave frames unlinked when the closest nav sample is further away than this (default: no limit)."
+        )
+        parser.add_argument(
+            "--rebuild-indexes", 
+            action="store_true", 
+            help="Drop the FrameIndex foreign key indexes during a large load and rebuild them afterwards."
+        )
 
     def handle(self, *args, **options):
-        mediaasset_id = options["mediaasset_id"]
+        self._restore_frame_indexes()
+        # Indexes are shared by all assets, so they are dropped and rebuilt
+        # once around the whole run rather than by each worker. API readers
+        # go without them meanwhile, so small loads keep them.
+        index_defs = []
+        if options["rebuild_indexes"]:
+            new_frames = self._count_new_frames(options["mediaasset_id"], options["force"])
+            if new_frames >= REBUILD_INDEXES_MIN_FRAMES:
+                index_defs = self._drop_frame_indexes()
+            else:
+                self.stdout.write(
+                    f"Keeping indexes: {new_frames} frames to write, "
+                    f"fewer than {REBUILD_INDEXES_MIN_FRAMES}."
+                )
+        try:
+            self.process_assets(options["mediaasset_id"], options)
+        finally:
+            self._create_frame_indexes(index_defs)
+
+    def process_assets(self, mediaasset_ids, options):
+        """Populate FrameIndex for every asset in `mediaasset_ids`, in parallel when there are several."""
+        if len(mediaasset_ids) == 1:
+            self.populate(mediaasset_ids[0], options)
+            return
+        
+        # Every asset writes its own frames, so assets are spread over
+        # separate processes without contending for rows
+        workers = min(options["workers"] or os.cpu_count(), len(mediaasset_ids))
+        worker_options = {name: options[name] for name in WORKER_OPTIONS}
+        # Worker processes have to open their own database connections
+        connections.close_all()
+        failed = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            futures = {
+                executor.submit(_populate, mediaasset_id, worker_options): mediaasset_id
+                for mediaasset_id in mediaasset_ids
+            }
+            for future in as_completed(futures):
+                mediaasset_id = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    failed.append(mediaasset_id)
+                    self.stdout.write(self.style.ERROR(f"MediaAsset {mediaasset_id} failed: {str(e)}"))
+        
+        if failed:
+            raise CommandError(f"Failed to process MediaAssets: {', '.join(map(str, sorted(failed)))}")
+        self.stdout.write(self.style.SUCCESS(f"Processed {len(mediaasset_ids)} media assets."))
+
+    def _count_new_frames(self, mediaasset_ids, force):
+        """Number of frames the run will write, as populate() computes them."""
+        assets = MediaAsset.objects.filter(
+            pk__in=mediaasset_ids, media_type=MediaAsset.MediaType.VIDEO,
+        ).exclude(end_time=None).exclude(fps=None)
+        if not force:
+            # assets that already have frames are refused without --force
+            assets = assets.exclude(frames__isnull=False)
+        return sum(
+            int((end_time - start_time).total_seconds() * float(fps))
+            for start_time, end_time, fps in assets.values_list("start_time", "end_time", "fps")
+        )
+
+    def _restore_frame_indexes(self):
+        """
+        Recreate FrameIndex indexes that the model declares but the table
+        lacks, e.g. because a --rebuild-indexes run was killed before it
+        could rebuild what it dropped.
+        """
+        table = FrameIndex._meta.db_table
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+        indexed_columns = {tuple(info["columns"]) for info in constraints.values() if info["index"]}
+        missing_indexes = [index for index in FrameIndex._meta.indexes if index.name not in constraints]
+        missing_fields = [
+            field for field in FrameIndex._meta.local_fields
+            if field.db_index and not field.unique and (field.column,) not in indexed_columns
+        ]
+        if not (missing_indexes or missing_fields):
+            return
+        
+        with connection.schema_editor(atomic=False) as schema_editor:
+            for index in missing_indexes:
+                self.stdout.write(self.style.WARNING(f"Restoring missing index {index.name}..."))
+                schema_editor.add_index(FrameIndex, index, concurrently=True)
+            for field in missing_fields:
+                self.stdout.write(self.style.WARNING(f"Restoring missing index on {field.column}..."))
+                schema_editor.execute(
+                    schema_editor._create_index_sql(FrameIndex, fields=[field], concurrently=True)
+                )
+
+    def _drop_frame_indexes(self):
+        """
+        Drop the plain indexes on FrameIndex's foreign key columns, which
+        only slow the bulk load down. The primary key and unique indexes
+        stay. Returns the dropped index definitions.
+        """
+        table = FrameIndex._meta.db_table
+        columns = [
+            FrameIndex._meta.get_field(name).column
+            for name in ("media_asset", "closest_nav_sample")
+        ]
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+            names = [
+                name for name, info in constraints.items()
+                if info["index"] and not info["primary_key"] and not info["unique"]
+                and set(info["columns"]) <= set(columns)
+            ]
+            if not names:
+                return []
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE tablename = %s AND indexname = ANY(%s)",
+                [table, names],
+            )
+            index_defs = cursor.fetchall()
+            # Printed before dropping, so they can be recreated by hand
+            self.stdout.write("Dropping indexes until the load finishes:")
+            for name, definition in index_defs:
+                self.stdout.write(f"  {definition};")
+            for name, _ in index_defs:
+                cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+        
+        return index_defs
+
+    def _create_frame_indexes(self, index_defs):
+        """Recreate indexes dropped by _drop_frame_indexes() without blocking writes."""
+        with connection.cursor() as cursor:
+            for name, definition in index_defs:
+                self.stdout.write(f"Rebuilding index {name}...")
+                cursor.execute(definition.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1))
+
+    def populate(self, mediaasset_id, options):
+        """Populate FrameIndex for one MediaAsset; `options` are the command's parsed options."""
         batch_size = options["batch_size"]
         force = options["force"]
+        max_nav_gap_ms = options["max_nav_gap_ms"]
         
         try:
+            # Only the columns used here; the mission and its rover are
+            # needed for the NavSample lookup and for printing the mission
             media_asset = MediaAsset.objects.select_related(
-                'deployment__mission'
+                'deployment__mission__rover'
+            ).only(
+                'id', 'media_type', 'start_time', 'end_time', 'fps',
+                'deployment__mission__start_time',
+                'deployment__mission__location',
+                'deployment__mission__rover__name',
             ).get(pk=mediaasset_id)
         except MediaAsset.DoesNotExist:
             raise CommandError(f"MediaAsset with id={mediaasset_id} does not exist.")
@@ -77,6 +253,7 @@ class Command(BaseCommand):
             mission=mission,
             batch_size=batch_size,
             force=force,
+            max_nav_gap_ms=max_nav_gap_ms,
             stdout=self.stdout
         )
         
@@ -89,6 +266,15 @@ class Command(BaseCommand):
             raise
 
 
+# Options a worker process needs to process one media asset
+WORKER_OPTIONS = ("batch_size", "force", "max_nav_gap_ms")
+
+
+def _populate(mediaasset_id, options):
+    """Process pool entry point: populate one media asset with a fresh Command."""
+    Command().populate(mediaasset_id, options)
+
+
 class FrameIndexProcessor:
     """
     Processor class for populating FrameIndex from MediaAsset video metadata.
@@ -97,11 +283,21 @@ class FrameIndexProcessor:
     NavSample records for a given mission.
     """
     
-    def __init__(self, media_asset, mission, batch_size=1000, force=False, stdout=None):
+    # Nav samples fetched per round trip while loading
+    NAV_CHUNK_SIZE = 50_000
+    
+    # FrameIndex columns written for every frame, in row order
+    FRAME_COLUMNS = (
+        "media_asset_id", "frame_number", "timestamp",
+        "closest_nav_sample_id", "nav_match_time_diff_ms",
+    )
+    
+    def __init__(self, media_asset, mission, batch_size=5000, force=False, max_nav_gap_ms=None, stdout=None):
         self.media_asset = media_asset
         self.mission = mission
         self.batch_size = batch_size
         self.force = force
+        self.max_nav_gap_ms = max_nav_gap_ms
         self.stdout = stdout
         
         self.stats = {
@@ -111,7 +307,7 @@ class FrameIndexProcessor:
             "errors": 0,
             "nav_samples_loaded": 0,
             "avg_time_diff_ms": 0.0,
-            "max_time_diff_ms": 0.0,
+            "max_time_diff_ms": 0,
         }
     
     def log_message(self, message):
@@ -125,149 +321,215 @@ class FrameIndexProcessor:
         
         # Clear existing frame indexes if force is enabled
         if self.force:
-            deleted_count = FrameIndex.objects.filter(media_asset=self.media_asset).count()
+            # Nothing references FrameIndex and it has no delete signals, so a
+            # single DELETE statement replaces the count and collector pass
+            frames = FrameIndex.objects.filter(media_asset=self.media_asset)
+            deleted_count = frames._raw_delete(frames.db)
             if deleted_count > 0:
-                FrameIndex.objects.filter(media_asset=self.media_asset).delete()
                 self.log_message(f"Deleted {deleted_count} existing frame indexes")
         
         # Load nav samples for the mission
-        nav_samples = self._load_nav_samples()
+        nav_ids, nav_us = self._load_nav_samples()
         
-        # Calculate frame parameters
+        # Calculate frame parameters, in integer microseconds since the epoch
         fps = float(self.media_asset.fps)
-        frame_interval = timedelta(seconds=1 / fps)
-        duration_seconds = (self.media_asset.end_time - self.media_asset.start_time).total_seconds()
-        total_frames = int(duration_seconds * fps)
+        start_us = to_us(self.media_asset.start_time)
+        end_us = to_us(self.media_asset.end_time)
+        # Frame interval rounded to whole microseconds
+        interval_us = round(1_000_000 / fps)
+        total_frames = int((end_us - start_us) / 1_000_000 * fps)
         
         self.log_message(f"Calculated {total_frames} frames at {fps} FPS")
-        self.log_message(f"Frame interval: {frame_interval}")
-        self.log_message(f"Loaded {len(nav_samples)} nav samples for mission")
+        self.log_message(f"Frame interval: {timedelta(microseconds=interval_us)}")
+        self.log_message(f"Loaded {len(nav_ids)} nav samples for mission")
         
         self.stats["total_frames"] = total_frames
-        self.stats["nav_samples_loaded"] = len(nav_samples)
-        
-        # Process frames in batches
-        batch = []
-        time_diffs = []
-        
-        for frame_number in range(total_frames):
-            try:
-                # Calculate frame timestamp
-                timestamp = self.media_asset.start_time + frame_number * frame_interval
-                
-                # Find closest nav sample
-                closest_nav_id, time_diff_ms = self._find_closest_nav_sample(
-                    timestamp, nav_samples
-                )
-                
-                # Track timing statistics
-                if time_diff_ms is not None:
-                    time_diffs.append(time_diff_ms)
-                    self.stats["frames_with_nav"] += 1
-                    if time_diff_ms > self.stats["max_time_diff_ms"]:
-                        self.stats["max_time_diff_ms"] = time_diff_ms
-                else:
-                    self.stats["frames_without_nav"] += 1
-                
-                # Create frame index object
-                frame_index = FrameIndex(
-                    media_asset=self.media_asset,
-                    frame_number=frame_number,
-                    timestamp=timestamp,
-                    closest_nav_sample_id=closest_nav_id,
-                    nav_match_time_diff_ms=time_diff_ms,
-                )
-                
-                batch.append(frame_index)
-                
-                # Flush batch if it reaches the batch size
-                if len(batch) >= self.batch_size:
-                    self._flush_batch(batch)
-                    batch = []
-                    
-            except Exception as e:
-                self.stats["errors"] += 1
-                logger.error(f"Error processing frame {frame_number}: {str(e)}")
-                continue
-        
-        # Flush any remaining frames
-        if batch:
-            self._flush_batch(batch)
-        
-        # Calculate average time difference
-        if time_diffs:
-            self.stats["avg_time_diff_ms"] = sum(time_diffs) / len(time_diffs)
+        self.stats["nav_samples_loaded"] = len(nav_ids)
+        
+        # Frame timestamps
+        frame_us = start_us + np.arange(total_frames, dtype=np.int64) * interval_us
+        
+        # Match every frame to its closest nav sample in one vectorised pass
+        closest_ids, time_diffs = self._match_nav_samples(frame_us, nav_ids, nav_us)
+        unlinked = None
+        if closest_ids is None:
+            self.stats["frames_without_nav"] = total_frames
+        else:
+            if self.max_nav_gap_ms is not None:
+                # Frames in a gap in the nav data are left unlinked rather
+                # than matched to a distant sample
+                unlinked = time_diffs > self.max_nav_gap_ms
+                if not unlinked.any():
+                    unlinked = None
+            linked_diffs = time_diffs if unlinked is None else time_diffs[~unlinked]
+            self.stats["frames_with_nav"] = len(linked_diffs)
+            self.stats["frames_without_nav"] = total_frames - len(linked_diffs)
+            if len(linked_diffs):
+                self.stats["avg_time_diff_ms"] = float(linked_diffs.mean())
+                self.stats["max_time_diff_ms"] = int(linked_diffs.max())
+        
+        # Stream frame index rows to the database in batches, as plain tuples.
+        # Rows go out in frame order, so the (media_asset, frame_number)
+        # unique index is filled sequentially rather than at random pages
+        for start in range(0, total_frames, self.batch_size):
+            end = min(start + self.batch_size, total_frames)
+            self._flush_batch(
+                self._iter_rows(start, end, frame_us, closest_ids, time_diffs, unlinked),
+                end - start,
+            )
+        
+        # Refresh the depth/yaw ranges used to filter media
+        self.media_asset.update_nav_ranges()
         
         # Print final statistics
         self._print_statistics()
     
+    def _iter_rows(self, start, end, frame_us, closest_ids, time_diffs, unlinked=None):
+        """
+        Yield the FrameIndex rows for frames `start` to `end`. Only this slice
+        of the arrays is converted to Python values, so memory use does not
+        grow with the length of the video. Frames flagged in `unlinked` get
+        no nav sample.
+        """
+        # ISO-8601 UTC strings, ready for COPY
+        timestamps = np.datetime_as_string(
+            np.datetime64(0, "us") + frame_us[start:end].astype("timedelta64[us]"),
+            unit="us", timezone="UTC",
+        ).tolist()
+        if closest_ids is None:
+            closest_ids = time_diffs = repeat(None)
+        else:
+            closest_ids = closest_ids[start:end].tolist()
+            time_diffs = time_diffs[start:end].tolist()
+            if unlinked is not None:
+                for i in np.flatnonzero(unlinked[start:end]).tolist():
+                    closest_ids[i] = time_diffs[i] = None
+        
+        yield from zip(
+            repeat(self.media_asset.pk), range(start, end), timestamps, closest_ids, time_diffs
+        )
+    
     def _load_nav_samples(self):
-        """Load all nav samples for the mission, sorted by timestamp."""
-        nav_samples = list(
+        """
+        Load all nav samples for the mission, sorted by timestamp.
+        
+        The arrays are cached per mission under MEDIA_ROOT/cache/nav, so the
+        assets of one mission only query the samples once. The cache is
+        reused while the mission's nav sample count, highest id and the
+        latest and total of their timestamps are unchanged (re-parsing a
+        log replaces the samples with new ids; editing one keeps its id).
+        
+        Returns:
+            tuple: (ids, timestamps in microseconds) int64 arrays
+        """
+        summary = NavSample.objects.filter(mission=self.mission).aggregate(
+            max_id=Max('id'), count=Count('id'),
+            max_ts=Max('ts_us'), sum_ts=Sum('ts_us'),
+        )
+        # the timestamp total can exceed int64, so the key is kept as text
+        key = np.array([
+            str(summary[name] or 0) for name in ('max_id', 'count', 'max_ts', 'sum_ts')
+        ])
+        cache_path = Path(settings.MEDIA_ROOT) / "cache" / "nav" / f"{self.mission.pk}.npz"
+        
+        try:
+            with np.load(cache_path) as cached:
+                if np.array_equal(cached["key"], key):
+                    self.log_message(f"Using cached nav samples from {cache_path}")
+                    return cached["ids"], cached["ts_us"]
+        except (OSError, KeyError, ValueError):
+            # Missing or unreadable cache: rebuild it below
+            pass
+        
+        nav_ids, nav_us = self._query_nav_samples()
+        
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write next to the final file and rename, so that concurrent
+            # workers never read a partial cache
+            tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, key=key, ids=nav_ids, ts_us=nav_us)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.error(f"Could not cache nav samples in {cache_path}: {str(e)}")
+        
+        return nav_ids, nav_us
+    
+    def _query_nav_samples(self):
+        """
+        Query the mission's nav samples, sorted by timestamp.
+        
+        Rows are streamed from a server-side cursor straight into int64
+        buffers, so no per-row Python objects are kept. The stored ts_us
+        column is read instead of converting every timestamp.
+        """
+        rows = (
             NavSample.objects.filter(mission=self.mission)
             .order_by('timestamp')
-            .values('id', 'timestamp')
+            .values_list('id', 'ts_us')
+            .iterator(chunk_size=self.NAV_CHUNK_SIZE)
         )
+        nav_ids = array('q')
+        nav_us = array('q')
+        for nav_id, ts_us in rows:
+            nav_ids.append(nav_id)
+            nav_us.append(ts_us)
         
-        if not nav_samples:
+        if not nav_ids:
             self.log_message("WARNING: No nav samples found for mission")
         
-        return nav_samples
+        return np.frombuffer(nav_ids, dtype=np.int64), np.frombuffer(nav_us, dtype=np.int64)
     
-    def _find_closest_nav_sample(self, target_timestamp, nav_samples):
+    def _match_nav_samples(self, frame_us, nav_ids, nav_us):
         """
-        Find the closest nav sample to the target timestamp using binary search.
+        Find the closest nav sample to every frame timestamp (in microseconds)
+        with one binary search over the sorted nav timestamps.
         
         Returns:
-            tuple: (nav_sample_id, time_diff_ms) or (None, None) if no samples
+            tuple: (nav_sample_ids, time_diffs_ms) arrays aligned with
+            `frame_us`, or (None, None) if there are no samples
         """
-        if not nav_samples:
+        if not len(nav_ids):
             return None, None
         
-        # Extract timestamps for binary search
-        timestamps = [ns['timestamp'] for ns in nav_samples]
+        # Insertion points, as bisect_left would find them, clamped so that
+        # every frame has a sample on each side to compare. Frames outside
+        # the sampled range then get a negative distance on the far side and
+        # pick the edge sample without any special casing. With a single
+        # sample both sides are that sample.
+        after = np.searchsorted(nav_us, frame_us).clip(1, len(nav_us) - 1)
+        before = after - 1
         
-        # Find insertion point
-        pos = bisect_left(timestamps, target_timestamp)
+        # Distances to both neighbours, computed once and reused for the
+        # time difference
+        to_before = frame_us - nav_us[before]
+        to_after = nav_us[after] - frame_us
         
-        # Handle edge cases
-        if pos == 0:
-            # Target is before all samples
-            closest_sample = nav_samples[0]
-        elif pos == len(timestamps):
-            # Target is after all samples
-            closest_sample = nav_samples[-1]
-        else:
-            # Target is between samples, find the closer one
-            before_sample = nav_samples[pos - 1]
-            after_sample = nav_samples[pos]
-            
-            before_diff = abs((target_timestamp - before_sample['timestamp']).total_seconds())
-            after_diff = abs((after_sample['timestamp'] - target_timestamp).total_seconds())
-            
-            if before_diff <= after_diff:
-                closest_sample = before_sample
-            else:
-                closest_sample = after_sample
+        # Pick the closer neighbour, the earlier one on ties
+        pick_before = to_before <= to_after
+        closest = np.where(pick_before, before, after)
         
-        # Calculate time difference in milliseconds
-        time_diff = (target_timestamp - closest_sample['timestamp']).total_seconds() * 1000
-        time_diff_ms = int(abs(time_diff))
+        # Time difference in whole milliseconds, as int32 like the
+        # IntegerField it is stored in; the statistics are taken from this
+        # array directly
+        time_diffs = (np.abs(np.where(pick_before, to_before, to_after)) // 1000).astype(np.int32)
         
-        return closest_sample['id'], time_diff_ms
+        return nav_ids[closest], time_diffs
     
-    def _flush_batch(self, batch):
-        """Flush a batch of frame indexes to the database."""
-        if not batch:
+    def _flush_batch(self, rows, count):
+        """Write `count` frame index rows (tuples in FRAME_COLUMNS order) with COPY."""
+        if not count:
             return
         
         try:
-            with transaction.atomic():
-                FrameIndex.objects.bulk_create(batch, ignore_conflicts=True)
-            self.log_message(f"Saved {len(batch)} frame indexes")
+            # Existing frames were refused or deleted up front, so rows go
+            # straight into the table instead of through a conflict check
+            copy_rows(FrameIndex, self.FRAME_COLUMNS, rows, ignore_conflicts=False)
+            self.log_message(f"Saved {count} frame indexes")
         except Exception as e:
             logger.error(f"Error saving frame index batch: {str(e)}")
-            self.stats["errors"] += len(batch)
+            self.stats["errors"] += count
     
     def _print_statistics(self):
         """Print processing statistics."""
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-15 22:48
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missions', '0016_alter_compasssample_deployment_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compasssample',
+            index=models.Index(fields=['log_file', 'timestamp'], name='missions_co_log_fil_97b905_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compasssample',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['timestamp'], name='compasssample_ts_brin'),
+        ),
+        migrations.AddIndex(
+            model_name='imusample',
+            index=models.Index(fields=['log_file', 'timestamp'], name='missions_im_log_fil_7eaf5f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imusample',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['timestamp'], name='imusample_ts_brin'),
+        ),
+        migrations.AddIndex(
+            model_name='navsample',
+            index=models.Index(fields=['yaw_deg'], name='missions_na_yaw_deg_933491_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pressuresample',
+            index=models.Index(fields=['log_file', 'timestamp'], name='missions_pr_log_fil_f48288_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pressuresample',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['timestamp'], name='pressuresample_ts_brin'),
+        ),
+    ]
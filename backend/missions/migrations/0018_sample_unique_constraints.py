@@ -0,0 +1,65 @@
+# Generated by Django 5.2.4 on 2026-10-15 22:49
+
+from django.db import migrations, models
+
+
+# Re-parsing a log with --force used to insert every sample again, so drop
+# the duplicates (keeping the lowest id per key) before the keys become unique.
+# Frames point at nav samples with PROTECT, so move them to the survivor first.
+DEDUPE_NAV_SQL = [
+    """
+    UPDATE missions_frameindex AS f
+    SET closest_nav_sample_id = d.keep_id
+    FROM (
+        SELECT id, MIN(id) OVER (PARTITION BY mission_id, "timestamp") AS keep_id
+        FROM missions_navsample
+    ) AS d
+    WHERE f.closest_nav_sample_id = d.id AND d.id <> d.keep_id
+    """,
+    """
+    DELETE FROM missions_navsample AS n
+    USING missions_navsample AS k
+    WHERE n.mission_id = k.mission_id
+      AND n."timestamp" = k."timestamp"
+      AND n.id > k.id
+    """,
+]
+
+DEDUPE_SENSOR_SQL = [
+    f"""
+    DELETE FROM missions_{model} AS s
+    USING missions_{model} AS k
+    WHERE s.log_file_id = k.log_file_id
+      AND s.deployment_id = k.deployment_id
+      AND s."timestamp" = k."timestamp"
+      AND s.id > k.id
+    """
+    for model in ("imusample", "compasssample", "pressuresample")
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missions', '0017_sample_time_range_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DEDUPE_NAV_SQL + DEDUPE_SENSOR_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='compasssample',
+            constraint=models.UniqueConstraint(fields=('log_file', 'deployment', 'timestamp'), name='unique_compasssample_per_deployment_timestamp'),
+        ),
+        migrations.AddConstraint(
+            model_name='imusample',
+            constraint=models.UniqueConstraint(fields=('log_file', 'deployment', 'timestamp'), name='unique_imusample_per_deployment_timestamp'),
+        ),
+        migrations.AddConstraint(
+            model_name='navsample',
+            constraint=models.UniqueConstraint(fields=('mission', 'timestamp'), name='unique_navsample_per_mission_timestamp'),
+        ),
+        migrations.AddConstraint(
+            model_name='pressuresample',
+            constraint=models.UniqueConstraint(fields=('log_file', 'deployment', 'timestamp'), name='unique_pressuresample_per_deployment_timestamp'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:03
+
+from django.db import migrations, models
+from django.db.models import Max, Min
+
+
+def fill_nav_ranges(apps, schema_editor):
+    MediaAsset = apps.get_model("missions", "MediaAsset")
+    assets = MediaAsset.objects.annotate(
+        frames_depth_min=Min("frames__closest_nav_sample__depth_m"),
+        frames_depth_max=Max("frames__closest_nav_sample__depth_m"),
+        frames_yaw_min=Min("frames__closest_nav_sample__yaw_deg"),
+        frames_yaw_max=Max("frames__closest_nav_sample__yaw_deg"),
+    )
+    for asset in assets.iterator():
+        asset.depth_min_m = asset.frames_depth_min
+        asset.depth_max_m = asset.frames_depth_max
+        asset.yaw_min_deg = asset.frames_yaw_min
+        asset.yaw_max_deg = asset.frames_yaw_max
+        asset.save(update_fields=["depth_min_m", "depth_max_m", "yaw_min_deg", "yaw_max_deg"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missions', '0018_sample_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='depth_max_m',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='depth_min_m',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='yaw_max_deg',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='yaw_min_deg',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='mediaasset',
+            index=models.Index(fields=['depth_min_m'], name='missions_me_depth_m_de6658_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaasset',
+            index=models.Index(fields=['depth_max_m'], name='missions_me_depth_m_e18c93_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaasset',
+            index=models.Index(fields=['yaw_min_deg'], name='missions_me_yaw_min_21f7a8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaasset',
+            index=models.Index(fields=['yaw_max_deg'], name='missions_me_yaw_max_534775_idx'),
+        ),
+        migrations.RunPython(fill_nav_ranges, migrations.RunPython.noop),
+    ]
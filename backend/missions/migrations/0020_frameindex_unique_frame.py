@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:11
+
+from django.db import migrations, models
+
+
+# Frames posted through the API, or two populate runs racing past their
+# existing-frames check, can repeat a frame number; keep the lowest id per
+# key, then refill the nav ranges (added in 0019) from the frames left.
+DEDUPE_FRAMES_SQL = [
+    """
+    DELETE FROM missions_frameindex AS f
+    USING missions_frameindex AS k
+    WHERE f.media_asset_id = k.media_asset_id
+      AND f.frame_number = k.frame_number
+      AND f.id > k.id
+    """,
+    """
+    UPDATE missions_mediaasset AS a
+    SET depth_min_m = r.depth_min_m, depth_max_m = r.depth_max_m,
+        yaw_min_deg = r.yaw_min_deg, yaw_max_deg = r.yaw_max_deg
+    FROM (
+        SELECT m.id,
+               MIN(n.depth_m) AS depth_min_m, MAX(n.depth_m) AS depth_max_m,
+               MIN(n.yaw_deg) AS yaw_min_deg, MAX(n.yaw_deg) AS yaw_max_deg
+        FROM missions_mediaasset AS m
+        LEFT JOIN missions_frameindex AS f ON f.media_asset_id = m.id
+        LEFT JOIN missions_navsample AS n ON n.id = f.closest_nav_sample_id
+        GROUP BY m.id
+    ) AS r
+    WHERE a.id = r.id
+    """,
+]
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missions', '0019_mediaasset_nav_ranges'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DEDUPE_FRAMES_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='frameindex',
+            constraint=models.UniqueConstraint(fields=('media_asset', 'frame_number'), name='unique_frameindex_per_asset_frame'),
+        ),
+    ]
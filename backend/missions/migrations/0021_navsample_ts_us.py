@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missions', '0020_frameindex_unique_frame'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='navsample',
+            name='ts_us',
+            field=models.BigIntegerField(editable=False, null=True),
+        ),
+        migrations.RunSQL(
+            "UPDATE missions_navsample "
+            "SET ts_us = round(EXTRACT(EPOCH FROM timestamp) * 1000000)::bigint",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='navsample',
+            name='ts_us',
+            field=models.BigIntegerField(editable=False),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missions', '0021_navsample_ts_us'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='navsample',
+            name='unique_navsample_per_mission_timestamp',
+        ),
+        migrations.RemoveIndex(
+            model_name='navsample',
+            name='missions_na_mission_7baca5_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='navsample',
+            constraint=models.UniqueConstraint(fields=('mission', 'timestamp'), include=('id', 'ts_us', 'depth_m', 'roll_deg', 'pitch_deg', 'yaw_deg'), name='unique_navsample_per_mission_timestamp'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:19
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missions', '0022_navsample_covering_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='navsample',
+            name='missions_na_depth_m_b24ed7_idx',
+        ),
+    ]
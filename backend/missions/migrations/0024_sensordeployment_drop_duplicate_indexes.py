@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missions', '0023_navsample_drop_depth_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='sensordeployment',
+            name='missions_se_mission_978a07_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='sensordeployment',
+            name='missions_se_sensor__c8bb3b_idx',
+        ),
+        migrations.AlterField(
+            model_name='sensordeployment',
+            name='mission',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='deployments', to='missions.mission'),
+        ),
+    ]
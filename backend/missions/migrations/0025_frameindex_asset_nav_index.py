@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missions', '0024_sensordeployment_drop_duplicate_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='frameindex',
+            name='media_asset',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='frames', to='missions.mediaasset'),
+        ),
+        migrations.AddIndex(
+            model_name='frameindex',
+            index=models.Index(fields=['media_asset', 'closest_nav_sample'], name='frame_asset_nav_idx'),
+        ),
+    ]
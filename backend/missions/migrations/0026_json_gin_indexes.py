@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:31
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missions', '0025_frameindex_asset_nav_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='calibration',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['coefficients'], name='calibration_coeffs_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='roverhardware',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['hardware_config'], name='rover_cfg_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missions', '0026_json_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='frameindex',
+            index=models.Index(fields=['media_asset', 'timestamp'], name='frame_asset_ts_idx'),
+        ),
+    ]
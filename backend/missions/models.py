@@ -1,17 +1,51 @@
 from django.db import models
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
 from django.utils import timezone
 from django.db import transaction
 from django.core.exceptions import ValidationError
+from datetime import datetime, timedelta, timezone as dt_timezone
 import logging
 
 # Get a logger instance
 logger = logging.getLogger(__name__)
 
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
 #  ------------------------------------------------------------------
 #  1. Hardware options
 #  ------------------------------------------------------------------
 
-class RoverHardware(models.Model):
+class ActiveVersionMixin:
+    """
+    Tracks whether a row with only one `active=True` row per `active_scope`
+    field was already the active one when loaded, so save() only has to
+    deactivate the others when a row becomes active (or moves scope).
+    """
+    active_scope = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "active" in field_names and cls.active_scope in field_names:
+            instance._stored_active_scope = instance._active_scope_value()
+        return instance
+
+    def _active_scope_value(self):
+        return getattr(self, self.active_scope) if self.active else None
+
+    def needs_deactivating_others(self):
+        """True if saving this row could leave two active rows in its scope."""
+        if not self.active:
+            return False
+        if self._state.adding:
+            return True
+        return getattr(self, "_stored_active_scope", None) != self._active_scope_value()
+
+    def remember_active_scope(self):
+        self._stored_active_scope = self._active_scope_value()
+
+
+class RoverHardware(ActiveVersionMixin, models.Model):
     """
     Represents the hardware configuration versioning for a rover
     Only one active configuration per rover name is allowed at a time.
@@ -23,6 +57,8 @@ class RoverHardware(models.Model):
     hardware_config  = models.JSONField(default=dict, blank=True)
     active         = models.BooleanField(default=True)
 
+    active_scope = "name"
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -31,6 +67,11 @@ class RoverHardware(models.Model):
                 name="unique_active_roverhardware_per_name",
             )
         ]
+        # jsonb_path_ops only serves @> (the API's containment filter), but is
+        # smaller and faster for it than the default operator class
+        indexes = [
+            GinIndex(fields=["hardware_config"], name="rover_cfg_gin", opclasses=["jsonb_path_ops"]),
+        ]
         ordering = ["-effective_from"]
 
     def save(self, *args, **kwargs):
@@ -38,12 +79,15 @@ class RoverHardware(models.Model):
         try:
             with transaction.atomic():
                 # Wrap in a transaction so “unset olds” + “save new” is atomic
-                if self.active:
-                    (RoverHardware.objects
-                        .filter(name=self.name, active=True)
-                        .exclude(pk=self.pk)                  # skip self on update
-                        .update(active=False))
+                # Skipped when the row was already the active one, e.g. when
+                # only hardware_config is edited
+                if self.needs_deactivating_others():
+                    others = RoverHardware.objects.filter(name=self.name, active=True)
+                    if not self._state.adding:
+                        others = others.exclude(pk=self.pk)   # skip self on update
+                    others.update(active=False)
                 super().save(*args, **kwargs)
+            self.remember_active_scope()
         except Exception as e:
             logger.error(f"Failed to save RoverHardware {self.name}: {e}")
             raise
@@ -73,11 +117,22 @@ class Sensor(models.Model):
     name            = models.CharField(max_length=100, unique=True)
     specification   = models.JSONField(blank=True, default=dict)
 
+    @property
+    def active_calibration(self):
+        """
+        The active calibration, or None. Reads `active_calibs` when the
+        active calibrations were prefetched into it (as the API does).
+        """
+        calibs = getattr(self, "active_calibs", None)
+        if calibs is None:
+            calibs = list(self.calibrations.filter(active=True)[:1])
+        return calibs[0] if calibs else None
+
     def __str__(self):
         return self.name
 
 
-class Calibration(models.Model):
+class Calibration(ActiveVersionMixin, models.Model):
     """
     Optional per-sensor (not per-mission) calibration history.
     Each sensor has calibration coefficients in JSON format.
@@ -92,6 +147,8 @@ class Calibration(models.Model):
     coefficients    = models.JSONField(blank=True, default=dict)
     active          = models.BooleanField(default=True)
 
+    active_scope = "sensor_id"
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -100,17 +157,23 @@ class Calibration(models.Model):
                 name="one_active_calibration_per_sensor",
             ),
         ]
+        indexes = [
+            GinIndex(fields=["coefficients"], name="calibration_coeffs_gin", opclasses=["jsonb_path_ops"]),
+        ]
         ordering = ["-effective_from"]
 
     def save(self, *args, **kwargs):
         # Wrap in a transaction so “unset olds” + “save new” is atomic
         with transaction.atomic():
-            if self.active:
-                (Calibration.objects
-                   .filter(sensor=self.sensor, active=True)
-                   .exclude(pk=self.pk)           # skip self on update
-                   .update(active=False))
+            # Skipped when the row was already the active one
+            if self.needs_deactivating_others():
+                # filter on sensor_id so an unloaded sensor is not fetched
+                others = Calibration.objects.filter(sensor_id=self.sensor_id, active=True)
+                if not self._state.adding:
+                    others = others.exclude(pk=self.pk)   # skip self on update
+                others.update(active=False)
             super().save(*args, **kwargs)
+        self.remember_active_scope()
 
     def __str__(self):
         status = "Active" if self.active else "Inactive"
@@ -185,8 +248,9 @@ class SensorDeployment(models.Model):
     Represents the specific deployment characteristics of a sensor on
     a specific mission.
     """
+    # mission lookups use the leading column of the unique constraint below
     mission     = models.ForeignKey(Mission, on_delete=models.CASCADE,
-                                    related_name="deployments")
+                                    related_name="deployments", db_index=False)
     sensor      = models.ForeignKey(Sensor, on_delete=models.PROTECT,
                                     related_name="deployments")
     calibration = models.ForeignKey(Calibration, on_delete=models.PROTECT,
@@ -205,6 +269,17 @@ class SensorDeployment(models.Model):
         help_text="Sensor type instance number (0 or 1 only)."
     )
 
+    @property
+    def latest_coefficients(self):
+        """
+        Coefficients of the deployment's own calibration, falling back to
+        the sensor's active calibration; None if there is neither.
+        """
+        if self.calibration_id is not None:
+            return self.calibration.coefficients
+        calib = self.sensor.active_calibration
+        return calib.coefficients if calib else None
+
     def clean(self):
         super().clean()  # Call the parent clean method first
         if self.calibration and self.calibration.sensor != self.sensor:
@@ -213,10 +288,6 @@ class SensorDeployment(models.Model):
             )
 
     class Meta:
-        indexes = [
-            models.Index(fields=["mission"]),
-            models.Index(fields=["sensor"]),
-        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["mission", "sensor", "instance"],
@@ -294,6 +365,9 @@ class NavSample(models.Model):
     mission   = models.ForeignKey(Mission, on_delete=models.CASCADE,
                                   related_name="nav_samples")
     timestamp = models.DateTimeField()
+    # timestamp as integer microseconds since the Unix epoch, kept in step
+    # with `timestamp` so bulk readers can skip datetime conversion
+    ts_us     = models.BigIntegerField(editable=False)
 
     # depth is often logged; altitude above seabed may be derived
     depth_m     = models.FloatField(null=True, blank=True)
@@ -303,13 +377,31 @@ class NavSample(models.Model):
     yaw_deg     = models.FloatField(null=True, blank=True)
 
     class Meta:
+        # depth_m alone is served by the leading column of (depth_m, yaw_deg)
         indexes = [
-            models.Index(fields=["mission", "timestamp"]),
-            models.Index(fields=["depth_m"]),
+            models.Index(fields=["yaw_deg"]),
             models.Index(fields=["depth_m","yaw_deg"]),
         ]
+        constraints = [
+            # Also the (mission, timestamp) index; the included columns let
+            # per-mission reads in time order (e.g. nav matching in
+            # populate_frameindex) be answered from the index alone
+            models.UniqueConstraint(
+                fields=["mission", "timestamp"],
+                include=["id", "ts_us", "depth_m", "roll_deg", "pitch_deg", "yaw_deg"],
+                name="unique_navsample_per_mission_timestamp"
+            )
+        ]
         ordering = ["mission", "timestamp"]
 
+    def save(self, *args, **kwargs):
+        # bulk_create() skips this, so bulk loaders set ts_us themselves
+        self.ts_us = (self.timestamp - EPOCH) // timedelta(microseconds=1)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "timestamp" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "ts_us"}
+        super().save(*args, **kwargs)
+
 #  ------------------------------------------------------------------
 #  6. Video and image data
 #  ------------------------------------------------------------------
@@ -333,6 +425,13 @@ class MediaAsset(models.Model):
     file_metadata = models.JSONField(default=dict, blank=True)
     notes        = models.TextField(blank=True)
 
+    # depth/yaw range of the nav samples linked to the frames, copied here
+    # so media can be filtered without joining FrameIndex and NavSample
+    depth_min_m  = models.FloatField(null=True, blank=True, editable=False)
+    depth_max_m  = models.FloatField(null=True, blank=True, editable=False)
+    yaw_min_deg  = models.FloatField(null=True, blank=True, editable=False)
+    yaw_max_deg  = models.FloatField(null=True, blank=True, editable=False)
+
     def clean(self):
         # Ensure file_path is not empty
         if not self.file_path.strip():
@@ -353,8 +452,29 @@ class MediaAsset(models.Model):
             if self.end_time and not timezone.is_aware(self.end_time):
                 raise ValidationError("End time must be timezone-aware.")
 
+    def update_nav_ranges(self):
+        """Recompute the denormalised depth/yaw ranges from the linked frames."""
+        ranges = self.frames.aggregate(
+            depth_min_m=models.Min("closest_nav_sample__depth_m"),
+            depth_max_m=models.Max("closest_nav_sample__depth_m"),
+            yaw_min_deg=models.Min("closest_nav_sample__yaw_deg"),
+            yaw_max_deg=models.Max("closest_nav_sample__yaw_deg"),
+        )
+        MediaAsset.objects.filter(pk=self.pk).update(**ranges)
+        for name, value in ranges.items():
+            setattr(self, name, value)
+        # update() sends no post_save, so retire the cached asset lists here
+        from missions.signals import invalidate_list_cache
+        invalidate_list_cache(MediaAsset)
+
     class Meta:
-        indexes = [models.Index(fields=["start_time"])]
+        indexes = [
+            models.Index(fields=["start_time"]),
+            models.Index(fields=["depth_min_m"]),
+            models.Index(fields=["depth_max_m"]),
+            models.Index(fields=["yaw_min_deg"]),
+            models.Index(fields=["yaw_max_deg"]),
+        ]
         ordering = ["start_time"]
 
 
@@ -366,8 +486,9 @@ class FrameIndex(models.Model):
     This allows for detailed indexing of frames within a media asset.
     It could be data from one of the cameras or the imaging sonar.
     """
+    # indexed through unique_frameindex_per_asset_frame and frame_asset_nav_idx
     media_asset   = models.ForeignKey(
-        MediaAsset, on_delete=models.CASCADE, related_name="frames")
+        MediaAsset, on_delete=models.CASCADE, related_name="frames", db_index=False)
     frame_number  = models.PositiveIntegerField(null=True, blank=True)
     timestamp     = models.DateTimeField()
     servo_pitch_deg = models.FloatField(null=True, blank=True)   # for Rpi camera tilt
@@ -397,6 +518,18 @@ class FrameIndex(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=["timestamp"]),
+            # Cursor pagination of one asset's frames seeks on this
+            models.Index(fields=["media_asset", "timestamp"], name="frame_asset_ts_idx"),
+            # The nav samples linked to an asset's frames, read from the index
+            # alone (MediaAsset.update_nav_ranges and the frame -> nav join)
+            models.Index(fields=["media_asset", "closest_nav_sample"], name="frame_asset_nav_idx"),
+        ]
+        constraints = [
+            # Also serves frame lookups and the default ordering
+            models.UniqueConstraint(
+                fields=["media_asset", "frame_number"],
+                name="unique_frameindex_per_asset_frame"
+            )
         ]
         ordering = ["media_asset", "frame_number"]
 
@@ -429,22 +562,47 @@ class SensorSampleBase(models.Model):
         ordering = ["timestamp"]
         indexes  = [
             models.Index(fields=["deployment", "timestamp"]),
+            models.Index(fields=["log_file", "timestamp"]),
+            # rows are appended in time order, so a BRIN index covers
+            # time-range scans for a fraction of the size of a btree
+            BrinIndex(fields=["timestamp"], name="%(class)s_ts_brin"),
+        ]
+        # re-importing a log skips rows that are already stored
+        constraints = [
+            models.UniqueConstraint(
+                fields=["log_file", "deployment", "timestamp"],
+                name="unique_%(class)s_per_deployment_timestamp"
+            )
         ]
 
     # Make sure the row is linked to the correct sensor *type*
     EXPECTED_SENSOR_TYPE: str = ""      # to be overloaded below
 
+    @classmethod
+    def validate_deployments(cls, deployment_ids):
+        """
+        Check in one query that every deployment in `deployment_ids` is of
+        EXPECTED_SENSOR_TYPE. Bulk loaders do not run full_clean() per row;
+        they check the deployments of a batch with this instead.
+        """
+        if not cls.EXPECTED_SENSOR_TYPE:
+            return
+        sensor_types = dict(
+            SensorDeployment.objects.filter(pk__in=set(deployment_ids))
+            .values_list("pk", "sensor__sensor_type")
+        )
+        for sensor_type in sensor_types.values():
+            if sensor_type != cls.EXPECTED_SENSOR_TYPE:
+                raise ValidationError(
+                    f"Deployment must be of type "
+                    f"'{cls.EXPECTED_SENSOR_TYPE}' (got "
+                    f"'{sensor_type}')"
+                )
+
     def clean(self):
         super().clean()
-        if (
-            self.EXPECTED_SENSOR_TYPE
-            and self.deployment.sensor.sensor_type != self.EXPECTED_SENSOR_TYPE
-        ):
-            raise ValidationError(
-                f"Deployment must be of type "
-                f"'{self.EXPECTED_SENSOR_TYPE}' (got "
-                f"'{self.deployment.sensor.sensor_type}')"
-            )
+        if self.deployment_id is not None:
+            self.validate_deployments([self.deployment_id])
         if self.timestamp and not timezone.is_aware(self.timestamp):
             raise ValidationError("Timestamp must be timezone-aware (UTC).")
 
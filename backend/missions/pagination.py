@@ -0,0 +1,27 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TimestampCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the high-volume sample and frame tables.
+
+    Each page continues from the position encoded in the `next` cursor, so
+    it is one index range scan however deep it is, and no COUNT(*) is run;
+    responses have `next`, `previous` and `results` but no `count`.
+    `?ordering=` still picks the sort field, so viewsets only offer
+    (near-)unique ones: the cursor has to step through tied values by offset.
+    """
+    ordering = "timestamp"
+    page_size = 500
+    page_size_query_param = "page_size"
+    max_page_size = 5000
+
+
+class FrameCursorPagination(TimestampCursorPagination):
+    """
+    Frames in frame order. The cursor position is the frame number, which
+    is unique within the media asset that frame listings are filtered by,
+    so each page seeks on the (media_asset, frame_number) unique index; the
+    asset breaks ties when frames of several assets are listed together.
+    """
+    ordering = ("frame_number", "media_asset_id")
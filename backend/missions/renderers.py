@@ -0,0 +1,26 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# DRF's encoder handles what orjson does not (Decimal, lazy strings, ...)
+_fallback = JSONEncoder().default
+
+
+def dumps(data):
+    """Encode `data` as compact UTF-8 JSON bytes with orjson."""
+    return orjson.dumps(data, default=_fallback)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson, which is several times faster on
+    pages of thousands of float-heavy sample rows. Requests for indented
+    output are handed to the standard renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
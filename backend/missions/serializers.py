@@ -1,3 +1,4 @@
+from functools import cached_property
 from rest_framework import serializers
 from missions.models import (
     RoverHardware, Sensor, Calibration, Mission,
@@ -6,6 +7,19 @@ from missions.models import (
     MediaAsset, FrameIndex,
 )
 
+class CachedFieldsMixin:
+    """
+    Collects the readable fields once per serializer instance. DRF walks
+    `fields` again for every object it represents, which shows up on list
+    pages of thousands of samples or frames. Fields must not be added or
+    removed after the first object has been represented.
+    """
+
+    @cached_property
+    def _readable_fields(self):
+        return tuple(field for field in self.fields.values() if not field.write_only)
+
+
 # Serializer for RoverHardware model
 class RoverHardwareSerializer(serializers.ModelSerializer):
     class Meta:
@@ -28,23 +42,14 @@ class CalibrationSerializer(serializers.ModelSerializer):
 
 # Serializer for Sensor model, includes a nested active calibration
 class SensorSerializer(serializers.ModelSerializer):
-    active_calibration = serializers.SerializerMethodField(read_only=True)
+    # Sensor.active_calibration reads the calibrations prefetched by SensorViewSet
+    active_calibration = CalibrationSerializer(read_only=True)
 
     class Meta:
         model = Sensor
         fields = ("id", "name", "sensor_type", "specification", "active_calibration")
         read_only_fields = ("id",)
 
-    # Method to fetch the active calibration associated with the sensor
-    def get_active_calibration(self, obj):
-        # Try to use prefetched calibrations if available
-        active = getattr(obj, "_prefetched_objects_cache", {}).get("calibrations")
-        if active is None:
-            # If not prefetched, fetch active calibrations from DB
-            active = obj.calibrations.filter(active=True)
-        calib = active.first()
-        return CalibrationSerializer(calib).data if calib else None
-
 
 # Serializer for Mission model with validation for time and depth fields
 class MissionSerializer(serializers.ModelSerializer):
@@ -67,8 +72,9 @@ class MissionSerializer(serializers.ModelSerializer):
     # Validate object-level constraints: end_time must be after start_time
     def validate(self, attrs):
         # Use current instance values if not provided in new data, mainly for updates
-        start = attrs.get("start_time", getattr(self.instance, "start_time", None))
-        end = attrs.get("end_time", getattr(self.instance, "end_time", None))
+        instance = self.instance
+        start = attrs["start_time"] if "start_time" in attrs else (instance.start_time if instance else None)
+        end = attrs["end_time"] if "end_time" in attrs else (instance.end_time if instance else None)
         if start and end and end <= start:
             raise serializers.ValidationError(
                 {"end_time": "End time must be after start time."}
@@ -84,8 +90,9 @@ class MissionSerializer(serializers.ModelSerializer):
 # Serializer for SensorDeployment model
 # adding custom fields for latest calibration coefficients and sensor name
 class SensorDeploymentSerializer(serializers.ModelSerializer):
-    # Custom field to retrieve latest calibration coefficients (active or specified
-    latest_coefficients = serializers.SerializerMethodField(read_only=True)
+    # Latest calibration coefficients (specified or the sensor's active one);
+    # SensorDeploymentViewSet prefetches the active calibrations
+    latest_coefficients = serializers.JSONField(read_only=True)
     # Expose linked sensor's name as a read-only field
     sensor_name = serializers.CharField(source="sensor.name", read_only=True)
     # Allows choosing instance number for the deployment, default 0
@@ -104,12 +111,6 @@ class SensorDeploymentSerializer(serializers.ModelSerializer):
             "instance",
         )
 
-    # Method to get latest coefficients 
-    # either specified calibration or active calibration from sensor
-    def get_latest_coefficients(self, obj):
-        calib = obj.calibration or obj.sensor.calibrations.filter(active=True).first()
-        return calib.coefficients if calib else None
-
 
 # Serializer for LogFile model with validation ensuring at least one log path is provided
 class LogFileSerializer(serializers.ModelSerializer):
@@ -125,9 +126,12 @@ class LogFileSerializer(serializers.ModelSerializer):
         )
 
     def validate(self, attrs):
-        bin_path = attrs.get("bin_path") or getattr(self.instance, "bin_path", None)
-        tlog_path = attrs.get("tlog_path") or getattr(self.instance, "tlog_path", None)
-        if not bin_path and not tlog_path:
+        instance = self.instance
+        bin_path = attrs.get("bin_path") or (instance.bin_path if instance else None)
+        if bin_path:
+            return attrs
+        tlog_path = attrs.get("tlog_path") or (instance.tlog_path if instance else None)
+        if not tlog_path:
             raise serializers.ValidationError(
                 "At least one of bin_path or tlog_path must be provided."
             )
@@ -135,7 +139,7 @@ class LogFileSerializer(serializers.ModelSerializer):
 
 
 # Serializer for NavSample model representing navigation data points
-class NavSampleSerializer(serializers.ModelSerializer):
+class NavSampleSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = NavSample
         fields = ('id', 'mission', 'timestamp', 'depth_m', 'roll_deg', 'pitch_deg', 'yaw_deg')
@@ -143,7 +147,7 @@ class NavSampleSerializer(serializers.ModelSerializer):
 
 
 # Base serializer for simple sensor samples - used as the parent for specific sample types
-class _BaseSampleSerializer(serializers.ModelSerializer):
+class _BaseSampleSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         fields = ("id", "deployment", "timestamp")
         read_only_fields = ("id",)
@@ -184,26 +188,22 @@ class PressureSampleSerializer(_BaseSampleSerializer):
         )
 
 # Serializer for MediaAsset model - e.g., images or videos collected during missions
-class MediaAssetSerializer(serializers.ModelSerializer):
-    # Custom field to include deployment details
-    deployment_details = serializers.SerializerMethodField(read_only=True)
+class MediaAssetSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    # Deployment details, read through the sensor and mission joined by MediaAssetViewSet
+    sensor_name = serializers.CharField(source='deployment.sensor.name', read_only=True)
+    sensor_type = serializers.CharField(source='deployment.sensor.sensor_type', read_only=True)
+    mission_id = serializers.IntegerField(source='deployment.mission_id', read_only=True)
+    mission_location = serializers.CharField(source='deployment.mission.location', read_only=True)
     
     class Meta:
         model = MediaAsset
         fields = (
             'id', 'deployment', 'media_type', 'file_path', 'start_time', 
-            'end_time', 'fps', 'file_metadata', 'notes', 'deployment_details',
+            'end_time', 'fps', 'file_metadata', 'notes',
+            'sensor_name', 'sensor_type', 'mission_id', 'mission_location',
+            'depth_min_m', 'depth_max_m', 'yaw_min_deg', 'yaw_max_deg',
         )
-        read_only_fields = ('id',)
-    
-    # Provide dictionary with deployment and mission info for the media asset
-    def get_deployment_details(self, obj):
-        return {
-            'sensor_name': obj.deployment.sensor.name,
-            'sensor_type': obj.deployment.sensor.sensor_type,
-            'mission_id': obj.deployment.mission.id,
-            'mission_location': obj.deployment.mission.location
-        }
+        read_only_fields = ('id', 'depth_min_m', 'depth_max_m', 'yaw_min_deg', 'yaw_max_deg')
     
     # Call validation from the parent class
     def validate(self, attrs):
@@ -215,25 +215,37 @@ class MediaAssetSerializer(serializers.ModelSerializer):
 class FrameIndexSerializer(serializers.ModelSerializer):
     # Expose the file path of the related media asset as a read-only field
     media_asset_path = serializers.CharField(source='media_asset.file_path', read_only=True)
-    # Include details of the closest navigation sample if it exists
-    nav_sample_details = serializers.SerializerMethodField(read_only=True)
+    # Navigation parameters of the closest navigation sample, null if there is none
+    depth_m = serializers.FloatField(source='closest_nav_sample.depth_m', read_only=True, allow_null=True)
+    yaw_deg = serializers.FloatField(source='closest_nav_sample.yaw_deg', read_only=True, allow_null=True)
+    pitch_deg = serializers.FloatField(source='closest_nav_sample.pitch_deg', read_only=True, allow_null=True)
+    roll_deg = serializers.FloatField(source='closest_nav_sample.roll_deg', read_only=True, allow_null=True)
 
     class Meta:
         model = FrameIndex
         fields = (
             'id', 'media_asset', 'frame_number', 'timestamp', 'servo_pitch_deg',
             'closest_nav_sample', 'nav_match_time_diff_ms', 'media_asset_path',
-            'nav_sample_details'
+            'depth_m', 'yaw_deg', 'pitch_deg', 'roll_deg',
         )
         read_only_fields = ('id',)
-    
-    # Method to create a dict of relevant navigation parameters from closest nav sample
-    def get_nav_sample_details(self, obj):
-        if obj.closest_nav_sample:
-            return {
-                'depth_m': obj.closest_nav_sample.depth_m,
-                'yaw_deg': obj.closest_nav_sample.yaw_deg,
-                'pitch_deg': obj.closest_nav_sample.pitch_deg,
-                'roll_deg': obj.closest_nav_sample.roll_deg
-            }
-        return None
\ No newline at end of file
+
+    # Written out by hand since list pages hold thousands of frames; keep in
+    # step with Meta.fields. The timestamp still goes through its field so
+    # it is formatted like every other datetime in the API
+    def to_representation(self, instance):
+        nav = instance.closest_nav_sample
+        return {
+            'id': instance.id,
+            'media_asset': instance.media_asset_id,
+            'frame_number': instance.frame_number,
+            'timestamp': self.fields['timestamp'].to_representation(instance.timestamp),
+            'servo_pitch_deg': instance.servo_pitch_deg,
+            'closest_nav_sample': instance.closest_nav_sample_id,
+            'nav_match_time_diff_ms': instance.nav_match_time_diff_ms,
+            'media_asset_path': instance.media_asset.file_path,
+            'depth_m': nav.depth_m if nav else None,
+            'yaw_deg': nav.yaw_deg if nav else None,
+            'pitch_deg': nav.pitch_deg if nav else None,
+            'roll_deg': nav.roll_deg if nav else None,
+        }
@@ -0,0 +1,58 @@
+import time
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+from missions.models import (
+    RoverHardware, Sensor, Calibration, Mission, SensorDeployment, MediaAsset,
+    NavSample, ImuSample, CompassSample, PressureSample,
+)
+
+# Cached list responses are keyed on this token, so replacing it retires all
+# of them at once
+LIST_CACHE_VERSION_KEY = "lists:version"
+
+# Models whose rows appear in a cached list, directly or through a related
+# field (e.g. a media asset's sensor name and mission location)
+LIST_CACHE_MODELS = (RoverHardware, Sensor, Calibration, Mission, SensorDeployment, MediaAsset)
+
+
+def list_cache_version():
+    return cache.get_or_set(LIST_CACHE_VERSION_KEY, time.time_ns, timeout=None)
+
+
+def invalidate_list_cache(sender, **kwargs):
+    cache.set(LIST_CACHE_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+for model in LIST_CACHE_MODELS:
+    post_save.connect(invalidate_list_cache, sender=model)
+    post_delete.connect(invalidate_list_cache, sender=model)
+
+
+# Sample models and the parent their list ETags are scoped by. Saves bump the
+# parent's version; deletes and bulk inserts change the count or highest id
+# that the ETag also carries. No post_delete receiver on purpose: it would
+# make Django delete a log's samples row by row instead of in one statement.
+SAMPLE_SCOPES = {
+    NavSample: "mission",
+    ImuSample: "deployment",
+    CompassSample: "deployment",
+    PressureSample: "deployment",
+}
+
+
+def sample_version_key(model, scope_id):
+    return "samples:version:{}:{}".format(model._meta.label_lower, scope_id)
+
+
+def sample_scope_version(model, scope_id):
+    return cache.get_or_set(sample_version_key(model, scope_id), time.time_ns, timeout=None)
+
+
+def invalidate_sample_scope(sender, instance, **kwargs):
+    scope_id = getattr(instance, f"{SAMPLE_SCOPES[sender]}_id")
+    cache.set(sample_version_key(sender, scope_id), time.time_ns(), timeout=None)
+
+
+for model in SAMPLE_SCOPES:
+    post_save.connect(invalidate_sample_scope, sender=model)
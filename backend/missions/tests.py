@@ -1,3 +1,157 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+from pymavlink.DFReader import DFReader_binary
+
+from missions.fastlog import FastLogReader
+from missions.models import (
+    EPOCH, RoverHardware, Sensor, Mission, SensorDeployment, LogFile,
+    NavSample, ImuSample, CompassSample, PressureSample,
+)
+
+# The first 300 KB of data/logs/dataflash/00000026.BIN, cut on a record
+# boundary: every FMT record plus a few hundred IMU/MAG/BARO/AHR2 records
+SHORT_LOG = Path(__file__).resolve().parent / "testdata" / "short.BIN"
+
+# The fields parse_bin_log reads from each message type
+WANTED_FIELDS = {
+    "IMU": ("TimeUS", "I", "GyrX", "GyrY", "GyrZ", "AccX", "AccY", "AccZ"),
+    "MAG": ("TimeUS", "I", "MagX", "MagY", "MagZ"),
+    "BARO": ("TimeUS", "I", "Press", "Temp"),
+    "AHR2": ("TimeUS", "Roll", "Pitch", "Yaw", "Alt"),
+}
+
+
+def read_with_dfreader(path, wanted_fields):
+    """{message type: {field: list of values}} as pymavlink's DFReader decodes them."""
+    reader = DFReader_binary(str(path))
+    try:
+        columns = {name: {field: [] for field in fields} for name, fields in wanted_fields.items()}
+        while True:
+            msg = reader.recv_match(type=list(wanted_fields))
+            if msg is None:
+                return columns
+            for field, values in columns[msg.get_type()].items():
+                values.append(getattr(msg, field))
+    finally:
+        reader.close()
+
+
+#  ------------------------------------------------------------------
+#  Fast DataFlash reader
+#  ------------------------------------------------------------------
+
+class FastLogReaderTests(SimpleTestCase):
+    """FastLogReader has to decode exactly what DFReader decodes."""
+
+    def setUp(self):
+        self.reader = FastLogReader(SHORT_LOG, WANTED_FIELDS)
+        self.addCleanup(self.reader.close)
+
+    def test_walk_offsets_match_dfreader(self):
+        dfreader = DFReader_binary(str(SHORT_LOG))
+        self.addCleanup(dfreader.close)
+        self.assertEqual([list(offsets) for offsets in self.reader._walk_offsets()], dfreader.offsets)
+
+    def test_index_matches_walk_offsets(self):
+        walked = self.reader._walk_offsets()
+        self.assertEqual([list(offsets) for offsets in self.reader._index()], walked)
+
+    def test_blocks_match_dfreader(self):
+        expected = read_with_dfreader(SHORT_LOG, WANTED_FIELDS)
+        # a block size that splits every message type across several blocks
+        decoded = {}
+        for name, columns in self.reader.blocks(block_size=97):
+            for field, column in columns.items():
+                decoded.setdefault(name, {}).setdefault(field, []).append(column)
+
+        self.assertEqual(set(decoded), set(WANTED_FIELDS))
+        for name, fields in expected.items():
+            for field, values in fields.items():
+                with self.subTest(message=name, field=field):
+                    self.assertTrue(values)
+                    np.testing.assert_array_equal(np.concatenate(decoded[name][field]), values)
+
+
+#  ------------------------------------------------------------------
+#  parse_bin_log
+#  ------------------------------------------------------------------
+
+class ParseBinLogTests(TransactionTestCase):
+    """
+    End-to-end parse of the short log. The samples are written from a
+    separate thread and connection, so the test commits for real.
+    """
+
+    def setUp(self):
+        start = datetime(2025, 6, 1, tzinfo=timezone.utc)
+        rover = RoverHardware.objects.create(name="test-rover")
+        self.mission = Mission.objects.create(
+            rover=rover, start_time=start, end_time=start + timedelta(hours=1)
+        )
+        # the default --imu-instances 0, --mag-instances 0,1 and --baro-instances 1
+        self.deployments = {}
+        for sensor_type, instance in [("imu", 0), ("compass", 0), ("compass", 1), ("pressure", 1)]:
+            sensor, _ = Sensor.objects.get_or_create(
+                sensor_type=sensor_type, name=f"test-{sensor_type}"
+            )
+            self.deployments[sensor_type, instance] = SensorDeployment.objects.create(
+                mission=self.mission, sensor=sensor, instance=instance, position="test"
+            )
+        # created at the mission start, so every record's TimeUS lies inside it
+        self.logfile = LogFile.objects.create(
+            mission=self.mission,
+            bin_path=str(SHORT_LOG.relative_to(settings.PROJECT_DIR)),
+            created_at=start,
+        )
+        self.expected = read_with_dfreader(SHORT_LOG, WANTED_FIELDS)
+
+    def parse(self, **options):
+        call_command("parse_bin_log", logfile_id=[self.logfile.pk], stdout=StringIO(), **options)
+
+    def expected_count(self, name, instances):
+        return sum(1 for instance in self.expected[name]["I"] if instance in instances)
+
+    def assert_sample_counts(self):
+        self.assertEqual(
+            ImuSample.objects.filter(log_file=self.logfile).count(),
+            self.expected_count("IMU", {0}),
+        )
+        self.assertEqual(
+            CompassSample.objects.filter(log_file=self.logfile).count(),
+            self.expected_count("MAG", {0, 1}),
+        )
+        self.assertEqual(
+            PressureSample.objects.filter(log_file=self.logfile).count(),
+            self.expected_count("BARO", {1}),
+        )
+        self.assertEqual(
+            NavSample.objects.filter(mission=self.mission).count(),
+            len(set(self.expected["AHR2"]["TimeUS"])),
+        )
+
+    def test_parse_stores_every_wanted_sample(self):
+        self.parse()
+
+        self.logfile.refresh_from_db()
+        self.assertTrue(self.logfile.already_parsed)
+        self.assert_sample_counts()
+
+        first = NavSample.objects.filter(mission=self.mission).order_by("timestamp").first()
+        ahr2 = self.expected["AHR2"]
+        self.assertEqual(
+            first.timestamp,
+            self.logfile.created_at + timedelta(microseconds=min(ahr2["TimeUS"])),
+        )
+        self.assertEqual(first.ts_us, (first.timestamp - EPOCH) // timedelta(microseconds=1))
+        self.assertAlmostEqual(first.roll_deg, ahr2["Roll"][ahr2["TimeUS"].index(min(ahr2["TimeUS"]))])
+
+    def test_force_reparse_does_not_duplicate_samples(self):
+        self.parse()
+        self.parse(force=True)
+        self.assert_sample_counts()
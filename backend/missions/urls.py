@@ -4,7 +4,7 @@ from missions.views import (
     SensorDeploymentViewSet, LogFileViewSet, NavSampleViewSet,
     ImuSampleViewSet, CompassSampleViewSet, PressureSampleViewSet,
 )
-from missions.views import MediaAssetViewSet, FrameIndexViewSet
+from missions.views import MediaAssetViewSet, FrameIndexViewSet, StatsViewSet
 
 router = DefaultRouter()
 router.register(r"rovers", RoverHardwareViewSet)
@@ -19,5 +19,6 @@ router.register(r"compasssamples", CompassSampleViewSet)
 router.register(r"pressuresamples", PressureSampleViewSet)
 router.register(r'media-assets', MediaAssetViewSet)
 router.register(r'frame-indices', FrameIndexViewSet)
+router.register(r'stats', StatsViewSet, basename='stats')
 
 urlpatterns = router.urls
\ No newline at end of file
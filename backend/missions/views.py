@@ -1,11 +1,19 @@
-from rest_framework import viewsets
+import hashlib
+from rest_framework import serializers, status, viewsets
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max, Q, Prefetch
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from datetime import timedelta
 
+from missions.bulk import copy_rows
 from missions.models import (
-    RoverHardware, Sensor, Calibration, Mission,
+    EPOCH, RoverHardware, Sensor, Calibration, Mission,
     SensorDeployment, LogFile, NavSample,
     ImuSample, CompassSample, PressureSample,
     MediaAsset, FrameIndex,
@@ -16,58 +24,288 @@ from missions.serializers import (
     ImuSampleSerializer, CompassSampleSerializer, PressureSampleSerializer,
     MediaAssetSerializer, FrameIndexSerializer,
 )
-from missions.filters import MissionFilter, MediaAssetFilter
+from missions.filters import (
+    MissionFilter, MediaAssetFilter, RoverHardwareFilter, CalibrationFilter,
+)
+from missions.pagination import FrameCursorPagination, TimestampCursorPagination
+from missions.renderers import ORJSONRenderer, dumps
+from missions.signals import list_cache_version, sample_scope_version
 
 # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 # DJANGO REST FRAMEWORK DEFAULT SETTINGS ARE SET IN core/settings.py
 # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 
+class SummaryListMixin:
+    """
+    List requests with `?summary=true` leave out the potentially large JSON
+    and text columns named in `summary_exclude`: they are neither fetched
+    from the database nor serialized. Full objects are still returned by
+    default and by retrieve.
+    """
+    summary_exclude = ()
+
+    def summary_requested(self):
+        return (
+            self.action == "list"
+            and self.request.query_params.get("summary", "").lower() in ("1", "true")
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.summary_exclude and self.summary_requested():
+            queryset = queryset.defer(*self.summary_exclude)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.summary_exclude and self.summary_requested():
+            fields = getattr(serializer, "child", serializer).fields
+            for name in self.summary_exclude:
+                fields.pop(name, None)
+        return serializer
+
+
+class CachedListMixin:
+    """
+    Caches the serialized list per request URL. The reference data served
+    this way is read far more often than it is written, so a cached page is
+    kept until any row of the models in missions.signals.LIST_CACHE_MODELS
+    is saved or deleted through the ORM, or MediaAsset.update_nav_ranges
+    rewrites an asset's ranges. Anything else (e.g. a queryset update in
+    the shell) shows up when `list_cache_timeout` expires.
+    """
+    list_cache_timeout = 30
+
+    def list(self, request, *args, **kwargs):
+        key = "list:{}:{}".format(
+            list_cache_version(),
+            hashlib.md5(request.build_absolute_uri().encode()).hexdigest(),
+        )
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, self.list_cache_timeout)
+        return Response(data)
+
+
+class SampleStreamMixin:
+    """
+    Adds a `stream` list route returning every sample that matches the
+    request's filters as one JSON array, without pagination. Rows are read
+    through a server-side cursor and written out as they arrive, so memory
+    use stays flat however many samples a mission or log file has.
+    """
+    STREAM_CHUNK_SIZE = 2000
+
+    @action(detail=False, methods=["get"])
+    def stream(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+
+        def rows():
+            yield b"["
+            separator = b""
+            for sample in queryset.iterator(chunk_size=self.STREAM_CHUNK_SIZE):
+                yield separator + dumps(serializer.to_representation(sample))
+                separator = b","
+            yield b"]"
+
+        return StreamingHttpResponse(rows(), content_type="application/json")
+
+
+class SampleBulkMixin:
+    """
+    Adds a `bulk` list route that stores a JSON array of samples with one
+    COPY ... FROM STDIN instead of an INSERT per row. Related objects named
+    in `bulk_related_fields` are sent as ids and checked with one query per
+    field rather than one per row. Samples that are already stored are
+    skipped, as they are when a log is re-parsed.
+    """
+    bulk_related_fields = ("deployment", "log_file")
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        fields = serializer.child.fields
+        for name in self.bulk_related_fields:
+            fields[name] = serializers.IntegerField(source=f"{name}_id")
+        serializer.is_valid(raise_exception=True)
+
+        samples = [self.prepare_bulk_sample(attrs) for attrs in serializer.validated_data]
+        if not samples:
+            return Response({"received": 0, "inserted": 0}, status=status.HTTP_201_CREATED)
+        self.validate_bulk_samples(samples)
+
+        model_class = self.get_queryset().model
+        names = list(dict.fromkeys(name for attrs in samples for name in attrs))
+        columns = [model_class._meta.get_field(name).column for name in names]
+        rows = ([attrs.get(name) for name in names] for attrs in samples)
+        inserted = copy_rows(model_class, columns, rows)
+        return Response(
+            {"received": len(samples), "inserted": inserted},
+            status=status.HTTP_201_CREATED,
+        )
+
+    def prepare_bulk_sample(self, attrs):
+        """Hook for columns that save() would normally fill in."""
+        return attrs
+
+    def validate_bulk_samples(self, samples):
+        model_class = self.get_queryset().model
+        errors = {}
+        for name in self.bulk_related_fields:
+            ids = {attrs[f"{name}_id"] for attrs in samples}
+            related_model = model_class._meta.get_field(name).related_model
+            missing = ids - set(related_model.objects.filter(pk__in=ids).values_list("pk", flat=True))
+            if missing:
+                errors[name] = [f"Invalid pk {pk} - object does not exist." for pk in sorted(missing)]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        if hasattr(model_class, "validate_deployments"):
+            try:
+                model_class.validate_deployments(attrs["deployment_id"] for attrs in samples)
+            except DjangoValidationError as e:
+                raise serializers.ValidationError({"deployment": e.messages})
+
+
+class SampleConditionalMixin:
+    """
+    First pages of list requests scoped to one parent (`?mission=` or
+    `?deployment=`, named by `etag_scope`) carry an ETag made from the
+    number and highest id of the parent's samples, plus a per-parent
+    version that missions.signals bumps whenever a sample is saved (an edit
+    changes neither the count nor the highest id). A client polling with
+    If-None-Match gets 304 Not Modified, without any rows being read or
+    serialized, until one of those changes. The aggregate is cached per
+    parent for a few seconds, so bursts of polls share one query whatever
+    their other filters.
+    """
+    etag_scope = "deployment"
+    ETAG_CACHE_TIMEOUT = 5
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_list_etag(request)
+        if etag is not None:
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+        response = self.list_samples(request, *args, **kwargs)
+        if etag is not None:
+            response["ETag"] = etag
+        return response
+
+    def list_samples(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def get_list_etag(self, request):
+        scope_id = request.query_params.get(self.etag_scope, "")
+        # later cursor pages are read once while paging, not polled
+        if not scope_id.isdigit() or self.paginator.cursor_query_param in request.query_params:
+            return None
+        model = self.get_queryset().model
+        key = "samples:etag:{}:{}".format(model._meta.label_lower, scope_id)
+        state = cache.get(key)
+        if state is None:
+            state = model.objects.filter(**{f"{self.etag_scope}_id": scope_id}).aggregate(
+                count=Count("id"), last=Max("id"),
+            )
+            cache.set(key, state, self.ETAG_CACHE_TIMEOUT)
+        version = sample_scope_version(model, scope_id)
+        return quote_etag("{count}-{last}-{version}".format(version=version, **state))
+
+
+def update_nav_ranges(assets):
+    """Recompute the depth/yaw ranges of the given media assets."""
+    for asset in assets.only("pk").distinct():
+        asset.update_nav_ranges()
+
+
 # ------------------------------------------------------------------
 # Rover Hardware
 # ------------------------------------------------------------------
-class RoverHardwareViewSet(viewsets.ModelViewSet):
-    queryset = RoverHardware.objects.prefetch_related("missions").all()
+class RoverHardwareViewSet(CachedListMixin, SummaryListMixin, viewsets.ModelViewSet):
+    # Missions are not serialized, so they are not prefetched
+    queryset = RoverHardware.objects.all()
     serializer_class = RoverHardwareSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    summary_exclude = ("hardware_config",)
+    filterset_class = RoverHardwareFilter
     search_fields = ["name"]
     ordering_fields = ["effective_from", "name"]
 
 # ------------------------------------------------------------------
 # Sensor
 # ------------------------------------------------------------------
-class SensorViewSet(viewsets.ModelViewSet):
-    queryset = Sensor.objects.prefetch_related("calibrations").all()
+class SensorViewSet(CachedListMixin, SummaryListMixin, viewsets.ModelViewSet):
+    # Only the active calibration is serialized, so only those are prefetched
+    queryset = Sensor.objects.prefetch_related(
+        Prefetch(
+            "calibrations",
+            queryset=Calibration.objects.filter(active=True).order_by("-effective_from"),
+            to_attr="active_calibs",
+        )
+    ).all()
     serializer_class = SensorSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    summary_exclude = ("specification",)
     search_fields = ["name", "sensor_type"]
     ordering_fields = ["name", "sensor_type"]
 
 # ------------------------------------------------------------------
 # Calibration
 # ------------------------------------------------------------------
-class CalibrationViewSet(viewsets.ModelViewSet):
-    queryset = Calibration.objects.select_related("sensor").all()
+class CalibrationViewSet(CachedListMixin, SummaryListMixin, viewsets.ModelViewSet):
+    # The sensor is serialized as its id, so it is not joined
+    queryset = Calibration.objects.all()
     serializer_class = CalibrationSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filterset_fields = ["sensor", "active"]
+    summary_exclude = ("coefficients",)
+    filterset_class = CalibrationFilter
     ordering_fields = ["effective_from"]
 
 # ------------------------------------------------------------------
 # Mission
 # ------------------------------------------------------------------
-class MissionViewSet(viewsets.ModelViewSet):
-    queryset = Mission.objects.select_related("rover").all()
+class MissionViewSet(SummaryListMixin, viewsets.ModelViewSet):
+    # The rover is serialized as its id, so it is not joined
+    queryset = Mission.objects.all()
     serializer_class = MissionSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    summary_exclude = ("notes",)
     filterset_class = MissionFilter
     search_fields = ["notes", "location"]
     ordering_fields = ["start_time", "max_depth"]
 
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        """Mission counts per target type and the locations visited, for the missions matching the filters."""
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        by_target_type = dict(
+            queryset.values_list("target_type").annotate(n=Count("id")).order_by("target_type")
+        )
+        locations = queryset.values_list("location", flat=True).distinct().order_by("location")
+        return Response({
+            "count": sum(by_target_type.values()),
+            "by_target_type": by_target_type,
+            "locations": list(locations),
+        })
+
 # ------------------------------------------------------------------
 # Sensor Deployment
 # ------------------------------------------------------------------
 class SensorDeploymentViewSet(viewsets.ModelViewSet):
-    queryset = SensorDeployment.objects.select_related("sensor", "mission").all()
+    # The active calibrations back latest_coefficients when a deployment has
+    # no calibration of its own
+    queryset = SensorDeployment.objects.select_related(
+        "sensor", "mission", "calibration"
+    ).prefetch_related(
+        Prefetch(
+            "sensor__calibrations",
+            queryset=Calibration.objects.filter(active=True).order_by("-effective_from"),
+            to_attr="active_calibs",
+        )
+    ).all()
     serializer_class = SensorDeploymentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     filterset_fields = ["sensor", "mission"]
@@ -76,62 +314,110 @@ class SensorDeploymentViewSet(viewsets.ModelViewSet):
 # ------------------------------------------------------------------
 # Log File
 # ------------------------------------------------------------------
-class LogFileViewSet(viewsets.ModelViewSet):
-    queryset = LogFile.objects.select_related("mission").all()
+class LogFileViewSet(SummaryListMixin, viewsets.ModelViewSet):
+    # The mission is serialized as its id, so it is not joined
+    queryset = LogFile.objects.all()
     serializer_class = LogFileSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    summary_exclude = ("notes",)
     filterset_fields = ["mission"]
     ordering_fields = ["created_at"]
 
 # ------------------------------------------------------------------
 # Navigation Sample
 # ------------------------------------------------------------------
-class NavSampleViewSet(viewsets.ModelViewSet):
-    queryset = NavSample.objects.select_related("mission").all()
+class NavSampleViewSet(SampleConditionalMixin, SampleStreamMixin, SampleBulkMixin, viewsets.ModelViewSet):
+    # Only the serialized columns; the mission is rendered as its id
+    queryset = NavSample.objects.only(*NavSampleSerializer.Meta.fields)
     serializer_class = NavSampleSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = TimestampCursorPagination
+    renderer_classes = [ORJSONRenderer]
     filterset_fields = ["mission", "depth_m", "timestamp"]
-    ordering_fields = ["timestamp", "depth_m"]
+    ordering_fields = ["timestamp"]
+    bulk_related_fields = ("mission",)
+    etag_scope = "mission"
+
+    def list_samples(self, request, *args, **kwargs):
+        # Every serialized field is a plain column, so rows are read as dicts
+        # instead of model instances and only the timestamps are formatted
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *NavSampleSerializer.Meta.fields
+        )
+        page = self.paginate_queryset(queryset)
+        to_timestamp = self.get_serializer().fields["timestamp"].to_representation
+        data = [
+            dict(row, timestamp=to_timestamp(row["timestamp"]))
+            for row in (queryset if page is None else page)
+        ]
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+    def prepare_bulk_sample(self, attrs):
+        # COPY bypasses NavSample.save(), which keeps ts_us in step
+        attrs["ts_us"] = (attrs["timestamp"] - EPOCH) // timedelta(microseconds=1)
+        return attrs
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        # the depth/yaw ranges of assets whose frames matched this sample
+        update_nav_ranges(MediaAsset.objects.filter(frames__closest_nav_sample=serializer.instance))
 
 # ------------------------------------------------------------------
 # IMU Sample
 # ------------------------------------------------------------------
-class ImuSampleViewSet(viewsets.ModelViewSet):
-    queryset = ImuSample.objects.select_related("deployment").all()
+class ImuSampleViewSet(SampleConditionalMixin, SampleStreamMixin, SampleBulkMixin, viewsets.ModelViewSet):
+    # Only the serialized columns; the deployment is rendered as its id
+    queryset = ImuSample.objects.only(*ImuSampleSerializer.Meta.fields)
     serializer_class = ImuSampleSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = TimestampCursorPagination
+    renderer_classes = [ORJSONRenderer]
     filterset_fields = ["deployment"]
     ordering_fields = ["timestamp"]
 
 # ------------------------------------------------------------------
 # Compass Sample
 # ------------------------------------------------------------------
-class CompassSampleViewSet(viewsets.ModelViewSet):
-    queryset = CompassSample.objects.select_related("deployment").all()
+class CompassSampleViewSet(SampleConditionalMixin, SampleStreamMixin, SampleBulkMixin, viewsets.ModelViewSet):
+    # Only the serialized columns; the deployment is rendered as its id
+    queryset = CompassSample.objects.only(*CompassSampleSerializer.Meta.fields)
     serializer_class = CompassSampleSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = TimestampCursorPagination
+    renderer_classes = [ORJSONRenderer]
     filterset_fields = ["deployment"]
     ordering_fields = ["timestamp"]
 
 # ------------------------------------------------------------------
 # Pressure Sample
 # ------------------------------------------------------------------
-class PressureSampleViewSet(viewsets.ModelViewSet):
-    queryset = PressureSample.objects.select_related("deployment").all()
+class PressureSampleViewSet(SampleConditionalMixin, SampleStreamMixin, SampleBulkMixin, viewsets.ModelViewSet):
+    # Only the serialized columns; the deployment is rendered as its id
+    queryset = PressureSample.objects.only(*PressureSampleSerializer.Meta.fields)
     serializer_class = PressureSampleSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = TimestampCursorPagination
+    renderer_classes = [ORJSONRenderer]
     filterset_fields = ["deployment"]
     ordering_fields = ["timestamp"]
 
 # ------------------------------------------------------------------
 # Media Asset
 # ------------------------------------------------------------------
-class MediaAssetViewSet(viewsets.ModelViewSet):
+class MediaAssetViewSet(CachedListMixin, SummaryListMixin, viewsets.ModelViewSet):
+    # The serializer reads the sensor's name and type and the mission's
+    # location; their JSON and text columns are not needed. Frames are not
+    # serialized, so they are not prefetched
     queryset = MediaAsset.objects.select_related(
-        'deployment__mission', 'deployment__sensor'
-    ).prefetch_related('frames').all()
+        'deployment__sensor', 'deployment__mission'
+    ).defer(
+        'deployment__sensor__specification', 'deployment__mission__notes'
+    ).all()
     serializer_class = MediaAssetSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    summary_exclude = ('file_metadata', 'notes')
     filterset_class = MediaAssetFilter
     search_fields = ['deployment__mission__location',]
     ordering_fields = ['start_time']
@@ -140,16 +426,50 @@ class MediaAssetViewSet(viewsets.ModelViewSet):
 # Frame Index
 # ------------------------------------------------------------------
 class FrameIndexViewSet(viewsets.ModelViewSet):
+    # Only the media asset's file path is serialized, so its free-form
+    # metadata and notes are not fetched with every frame
     queryset = FrameIndex.objects.select_related(
         'media_asset', 'closest_nav_sample'
-    ).all()
+    ).defer('media_asset__file_metadata', 'media_asset__notes').all()
     serializer_class = FrameIndexSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = FrameCursorPagination
+    renderer_classes = [ORJSONRenderer]
     filterset_fields = [
         'media_asset',
         'frame_number',
         'closest_nav_sample__depth_m',
         'closest_nav_sample__yaw_deg',
     ]
-    ordering_fields = ['timestamp', 'frame_number']
+    ordering_fields = ['frame_number', 'timestamp']
+
+    # Keep the linked assets' depth/yaw ranges in step with their frames
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        update_nav_ranges(MediaAsset.objects.filter(pk=serializer.instance.media_asset_id))
+
+    def perform_update(self, serializer):
+        old_asset = serializer.instance.media_asset_id
+        super().perform_update(serializer)
+        update_nav_ranges(MediaAsset.objects.filter(pk__in=[old_asset, serializer.instance.media_asset_id]))
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        update_nav_ranges(MediaAsset.objects.filter(pk=instance.media_asset_id))
+
+
+# ------------------------------------------------------------------
+# Dashboard Stats
+# ------------------------------------------------------------------
+class StatsViewSet(viewsets.ViewSet):
+    """Row counts for the dashboard tiles, in one request."""
+    permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def list(self, request):
+        return Response({
+            "missions": Mission.objects.count(),
+            "sensors": Sensor.objects.count(),
+            "calibrations": Calibration.objects.count(),
+            "media_assets": MediaAsset.objects.count(),
+            "rovers": RoverHardware.objects.count(),
+        })
@@ -16,6 +16,21 @@ st.set_page_config(
 if 'api_client' not in st.session_state:
     st.session_state.api_client = APIClient(API_BASE_URL)
 
+# Dashboard tiles: label and the count they show from the stats endpoint
+DASHBOARD_COUNTS = [
+    ("📋 Total Missions", 'missions'),
+    ("🔧 Total Sensors", 'sensors'),
+    ("📊 Calibrations", 'calibrations'),
+    ("🎥 Media Assets", 'media_assets'),
+    ("🚖 Rovers", 'rovers'),
+]
+
+# All dashboard counts come from one request and are shared across reruns
+# for a short while
+@st.cache_data(ttl=30, show_spinner=False)
+def get_dashboard_counts():
+    return st.session_state.api_client.get_stats()
+
 def main():
     """Main application function"""
     
@@ -38,32 +53,10 @@ def main():
     
     # Quick stats
     try:
-        col1, col2, col3, col4, col5 = st.columns(5)
-        
-        with col1:
-            missions = st.session_state.api_client.get_missions()
-            st.metric("📋 Total Missions", len(missions) if missions else 0)
-        
-        with col2:
-            sensors = st.session_state.api_client.get_sensors()
-            st.metric("🔧 Total Sensors", len(sensors) if sensors else 0)
-        
-        with col3:
-            calibrations = st.session_state.api_client.get_calibrations()
-            st.metric("📊 Calibrations", len(calibrations) if calibrations else 0)
-        
-        with col4:
-            media_response = st.session_state.api_client.get_media_assets(filters=None)
-            media_count = 0
-            if isinstance(media_response, dict):
-                media_count = media_response.get('count', 0)
-            elif isinstance(media_response, list):
-                media_count = len(media_response)
-            st.metric("🎥 Media Assets", media_count)
-    
-        with col5:
-            rovers = st.session_state.api_client.get_rovers()
-            st.metric("🚖 Rovers", len(rovers) if rovers else 0)
+        counts = get_dashboard_counts()
+        for col, (label, key) in zip(st.columns(len(DASHBOARD_COUNTS)), DASHBOARD_COUNTS):
+            with col:
+                st.metric(label, counts.get(key, 0))
             
     except Exception as e:
         st.error(f"Error loading dashboard stats: {str(e)}")
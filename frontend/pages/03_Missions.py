@@ -129,22 +129,18 @@ def main():
                         display_mission_details(mission)
                         st.markdown("---")
                 
-                # Show summary statistics
+                # Show summary statistics, counted over all missions by the backend
                 st.sidebar.header("Mission Statistics")
+                stats = st.session_state.api_client.get_mission_stats()
                 
                 # Count by target type
-                target_counts = {}
-                for mission in missions:
-                    target_type = mission.get('target_type', 'Unknown')
-                    target_counts[target_type] = target_counts.get(target_type, 0) + 1
-                
-                for target_type, count in target_counts.items():
+                for target_type, count in stats.get('by_target_type', {}).items():
                     st.sidebar.metric(f"{target_type.title()} Missions", count)
                 
                 # Show locations
-                locations = list(set(mission.get('location', 'Unknown') for mission in missions))
+                locations = stats.get('locations', [])
                 st.sidebar.write(f"**Locations:** {len(locations)}")
-                for location in sorted(locations):
+                for location in locations:
                     st.sidebar.write(f"• {location}")
                 
             else:
@@ -106,7 +106,8 @@ display_columns = {
     "file_path": "File Path",
     "start_time": "Start Time",
     "end_time": "End Time",
-    "deployment_details": "Deployment Details",
+    "sensor_name": "Sensor",
+    "mission_location": "Mission Location",
 }
 avail_cols = [c for c in display_columns.keys() if c in df.columns]
 df_display = df[avail_cols].rename(columns=display_columns)
@@ -178,8 +179,11 @@ for asset in selected_assets:
             )
 
             if matched_frame and isinstance(matched_frame, dict):
-                nav: Optional[Dict[str, Any]] = matched_frame.get("nav_sample_details")
-                if nav and isinstance(nav, dict):
+                # Frames carry the closest nav sample's values as flat fields
+                nav: Optional[Dict[str, Any]] = (
+                    matched_frame if matched_frame.get("closest_nav_sample") else None
+                )
+                if nav:
                     c1, c2, c3, c4 = st.columns(4)
                     c1.metric("Depth (m)", f"{nav.get('depth_m', 'N/A'):.2f}" if nav.get("depth_m") is not None else "N/A")
                     c2.metric("Yaw (°)", f"{nav.get('yaw_deg', 'N/A'):.2f}" if nav.get("yaw_deg") is not None else "N/A")
@@ -193,9 +197,8 @@ for asset in selected_assets:
             st.warning(f"Frame navigation fetch error: {e}")
 
     # Deployment details
-    dep = asset.get("deployment_details", {})
-    st.markdown(f"**Mission Location:** {dep.get('mission_location', 'N/A')}")
-    st.markdown(f"**Sensor:** {dep.get('sensor_name', 'N/A')} ({dep.get('sensor_type', 'N/A')})")
+    st.markdown(f"**Mission Location:** {asset.get('mission_location', 'N/A')}")
+    st.markdown(f"**Sensor:** {asset.get('sensor_name', 'N/A')} ({asset.get('sensor_type', 'N/A')})")
     st.markdown(f"**Time Range:** {asset.get('start_time')} → {asset.get('end_time', 'N/A')}")
     st.markdown(f"**File Path:** {file_path}")
     st.markdown("---")
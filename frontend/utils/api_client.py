@@ -48,6 +48,10 @@ class APIClient:
         except:
             return False
     
+    def get_stats(self) -> Dict:
+        """Get the dashboard row counts in one request"""
+        return self._make_request('GET', '/stats/')
+
     # Rover methods
     def get_rovers(self) -> List[Dict]:
         """Get all rover hardware"""
@@ -64,6 +68,10 @@ class APIClient:
         """Get a specific mission"""
         return self._make_request('GET', f'/missions/{mission_id}/')
 
+    def get_mission_stats(self) -> Dict:
+        """Get mission counts per target type and the list of locations"""
+        return self._make_request('GET', '/missions/stats/')
+
 
      # Sensor methods
     def get_sensors(self) -> List[Dict]: